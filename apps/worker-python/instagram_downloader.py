@@ -1,5 +1,7 @@
-import yt_dlp
 import os
+import re
+import shutil
+import hashlib
 import tempfile
 import logging
 from typing import Optional, Dict, Any
@@ -7,9 +9,37 @@ from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# Prefer RE2's linear-time engine for URL matching when it is installed
+try:
+    import re2 as _url_re
+except ImportError:
+    _url_re = re
+
+# Reel ID pattern for /reel/, /reels/ and /p/ URLs, compiled once at import.
+# The ID is the run of ID characters after the prefix, whatever follows it and
+# however long it is; with nothing after the character class there is nothing
+# to backtrack into. A single search() on this pattern is faster than an
+# equivalent str.partition/split parser, so keep the regex.
+_REEL_ID_RE = _url_re.compile(r'instagram\.com/(?:reels?|p)/([A-Za-z0-9_-]+)')
+
+
+class InstagramDownloadError(Exception):
+    """Raised when an Instagram Reel cannot be downloaded or its metadata extracted"""
+
+
 class InstagramDownloader:
-    def __init__(self, browser_cookies: Optional[str] = None, cookies_file: Optional[str] = None):
-        self.temp_dir = tempfile.mkdtemp(prefix="instagram_")
+    # Shared yt-dlp `cookiesfrombrowser` values for the browsers yt-dlp supports,
+    # so the common case reuses one tuple instead of building it per download
+    _BROWSER_COOKIE_TUPLES = {
+        browser: (browser,)
+        for browser in ('brave', 'chrome', 'chromium', 'edge', 'firefox', 'opera', 'safari', 'vivaldi', 'whale')
+    }
+
+    def __init__(self, browser_cookies: Optional[str] = None, cookies_file: Optional[str] = None,
+                 temp_dir: Optional[str] = None):
+        # A caller-provided temp_dir is owned by the caller and left alone by cleanup()
+        self._owns_temp_dir = temp_dir is None
+        self.temp_dir = temp_dir or tempfile.mkdtemp(prefix="instagram_")
         self.browser_cookies = browser_cookies  # e.g., 'chrome', 'firefox', 'safari'
         self.cookies_file = cookies_file  # Path to cookies.txt file
         
@@ -25,6 +55,9 @@ class InstagramDownloader:
         Returns:
             Dict containing video path, caption, username, and other metadata
         """
+        # yt-dlp is heavy to import; load it only when a download is requested
+        import yt_dlp
+        
         try:
             # Configure yt-dlp options
             ydl_opts = {
@@ -52,7 +85,9 @@ class InstagramDownloader:
             
             # Add cookie options if provided
             if self.browser_cookies:
-                ydl_opts['cookiesfrombrowser'] = (self.browser_cookies,)
+                ydl_opts['cookiesfrombrowser'] = (
+                    self._BROWSER_COOKIE_TUPLES.get(self.browser_cookies) or (self.browser_cookies,)
+                )
                 logger.info(f"Using cookies from browser: {self.browser_cookies}")
             elif self.cookies_file:
                 ydl_opts['cookiefile'] = self.cookies_file
@@ -103,33 +138,31 @@ class InstagramDownloader:
                 
         except Exception as e:
             logger.error(f"Failed to download Instagram Reel {url}: {str(e)}")
-            raise Exception(f"Instagram download failed: {str(e)}")
+            raise InstagramDownloadError(f"Instagram download failed: {str(e)}") from e
     
-    def _extract_reel_id(self, url: str) -> str:
+    @staticmethod
+    def _extract_reel_id(url: str) -> str:
         """Extract reel ID from Instagram URL"""
-        import re
-        
-        patterns = [
-            r'instagram\.com/reel/([A-Za-z0-9_-]+)',
-            r'instagram\.com/reels/([A-Za-z0-9_-]+)',
-            r'instagram\.com/p/([A-Za-z0-9_-]+)',
-        ]
+        match = _REEL_ID_RE.search(url)
+        if match:
+            return match.group(1)
         
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        
-        # Fallback: use a hash of the URL
-        import hashlib
-        return hashlib.md5(url.encode()).hexdigest()[:12]
+        # Fallback: use a hash of the URL (6-byte digest -> 12 hex chars)
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=6).hexdigest()
     
     def cleanup(self):
         """Clean up temporary files"""
-        import shutil
-        if os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
-            logger.info(f"Cleaned up temporary directory: {self.temp_dir}")
+        if not self._owns_temp_dir:
+            return
+        try:
+            # Most downloaders never write into their temp dir, so try the
+            # single-syscall removal first and only walk the tree if needed
+            os.rmdir(self.temp_dir)
+        except OSError:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+        # The directory is gone, so repeated cleanup() calls have nothing to do
+        self._owns_temp_dir = False
+        logger.info(f"Cleaned up temporary directory: {self.temp_dir}")
 
 # Test function
 def test_download():
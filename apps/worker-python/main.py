@@ -1,14 +1,15 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from faster_whisper import WhisperModel
 import pytesseract
 from PIL import Image
 import io
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict, Any
 import logging
 from pydantic import BaseModel
 from instagram_downloader import InstagramDownloader
+from whisper_loader import get_whisper_model
 from video_downloader import VideoDownloader
 from audio_preprocessing import preprocess_audio
 from text_postprocessing import post_process_transcript
@@ -93,49 +94,6 @@ class SemanticSimilarityResponse(BaseModel):
     timing: float
     error: Optional[str] = None
 
-# Initialize Whisper model lazily
-model = None
-
-def get_whisper_model(model_size: Optional[str] = None, compute_type: Optional[str] = None):
-    """
-    Get Whisper model with configurable size and compute type.
-    
-    Args:
-        model_size: Model size (base, small, medium, large-v3). Defaults to env var WHISPER_MODEL_SIZE or "medium"
-        compute_type: Compute type (int8, float16, float32). Defaults to env var WHISPER_COMPUTE_TYPE or "float16"
-    
-    Returns:
-        WhisperModel instance
-    """
-    global model
-    
-    # Get configuration from environment variables or parameters
-    model_size = model_size or os.getenv("WHISPER_MODEL_SIZE", "medium")
-    compute_type = compute_type or os.getenv("WHISPER_COMPUTE_TYPE", "int8")
-    
-    # Validate model size
-    valid_sizes = ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"]
-    if model_size not in valid_sizes:
-        logger.warning(f"Invalid model size: {model_size}, using medium")
-        model_size = "medium"
-    
-    # Validate compute type
-    valid_compute_types = ["int8", "int8_float16", "int16", "float16", "float32"]
-    if compute_type not in valid_compute_types:
-        logger.warning(f"Invalid compute type: {compute_type}, using float16")
-        compute_type = "float16"
-    
-    # Create model key for caching
-    model_key = f"{model_size}_{compute_type}"
-    
-    if model is None or not hasattr(model, '_model_key') or model._model_key != model_key:
-        print(f"Loading Whisper model: {model_size} with {compute_type}...")
-        model = WhisperModel(model_size, compute_type=compute_type)
-        model._model_key = model_key  # Store model key for caching
-        print(f"Whisper model {model_size} loaded with {compute_type}!")
-    
-    return model
-
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "service": "worker-python"}
@@ -236,50 +194,57 @@ async def asr(
         logger.error(f"ASR failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"ASR processing failed: {str(e)}")
 
+def ocr_frame(image_data: bytes) -> List[Dict[str, Any]]:
+    """
+    Run Tesseract on one encoded image and return its confident word boxes.
+    
+    Args:
+        image_data: Encoded image bytes
+    
+    Returns:
+        List of {"box": [x, y, w, h], "text": str} entries
+    """
+    image = Image.open(io.BytesIO(image_data))
+    
+    # Extract words and bounding boxes in a single Tesseract run;
+    # each pytesseract call spawns its own tesseract process
+    boxes = []
+    data = pytesseract.image_to_data(image, lang='eng', output_type=pytesseract.Output.DICT)
+    
+    for i in range(len(data['text'])):
+        if int(data['conf'][i]) > 30:  # Confidence threshold
+            x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
+            text_content = data['text'][i].strip()
+            
+            if text_content:
+                boxes.append({
+                    "box": [x, y, w, h],
+                    "text": text_content
+                })
+    
+    return boxes
+
 @app.post("/ocr")
 async def ocr(files: List[UploadFile] = File(...)):
     """Optical Character Recognition on image frames"""
     start_time = time.time()
     
     try:
-        results = []
+        # Read images
+        images = [await file.read() for file in files]
         
-        for file in files:
-            # Read image
-            image_data = await file.read()
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Extract text using Tesseract
-            text = pytesseract.image_to_string(image, lang='eng')
-            
-            # Get bounding boxes
-            boxes = []
-            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            
-            for i in range(len(data['text'])):
-                if int(data['conf'][i]) > 30:  # Confidence threshold
-                    x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-                    text_content = data['text'][i].strip()
-                    
-                    if text_content:
-                        boxes.append({
-                            "box": [x, y, w, h],
-                            "text": text_content
-                        })
-            
-            results.append({
-                "filename": file.filename,
-                "boxes": boxes,
-                "full_text": text.strip()
-            })
+        # Tesseract runs in a subprocess, so frames OCR in parallel threads;
+        # map() keeps the results in upload order
+        with ThreadPoolExecutor(max_workers=min(len(images), os.cpu_count() or 1)) as executor:
+            frame_boxes = list(executor.map(ocr_frame, images))
         
         timing = (time.time() - start_time) * 1000
         
         return {
             "frames": [{
                 "t": i,
-                "boxes": result["boxes"]
-            } for i, result in enumerate(results)],
+                "boxes": boxes
+            } for i, boxes in enumerate(frame_boxes)],
             "timing": timing
         }
         
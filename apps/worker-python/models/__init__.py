@@ -7,17 +7,186 @@ Named Entity Recognition and Semantic Similarity analysis.
 
 import os
 import logging
-from typing import Optional, Dict, Any
+import threading
+from typing import Dict, Optional, Tuple
 import torch
-from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
+from transformers import AutoConfig, AutoTokenizer, AutoModelForTokenClassification, pipeline
 from sentence_transformers import SentenceTransformer
 import spacy
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait
 
 logger = logging.getLogger(__name__)
 
-# Global model cache
-_model_cache: Dict[str, Any] = {}
+# Short input run through freshly loaded models before they serve requests
+_WARMUP_TEXT = "The quick brown fox jumps over the lazy dog."
+_WARMUP_RUNS = 3
+
+
+def _warmup(run, device: str):
+    """
+    Run a few dummy inputs through a freshly loaded model.
+    
+    Moves one-off costs (lazy initialization, CUDA kernel selection) out of
+    the first real request. Disabled with MODEL_WARMUP=false.
+    """
+    if os.getenv("MODEL_WARMUP", "true").lower() != "true":
+        return
+    
+    with torch.inference_mode():
+        for _ in range(_WARMUP_RUNS):
+            run(_WARMUP_TEXT)
+    
+    if device == "cuda":
+        torch.cuda.synchronize()
+
+
+@lru_cache(maxsize=None)
+def _cuda_available() -> bool:
+    """Probe for a usable GPU once per process; the first probe initializes the CUDA driver."""
+    return torch.cuda.is_available()
+
+
+def _from_pretrained(load, model_name: str, **kwargs):
+    """
+    Call a from_pretrained-style loader, trying the local HF cache (HF_HOME) first.
+    
+    A cache hit skips the Hub revalidation requests; a miss raises OSError and
+    falls back to a normal, downloading load.
+    """
+    try:
+        return load(model_name, local_files_only=True, **kwargs)
+    except OSError:
+        return load(model_name, **kwargs)
+
+
+def _compile(module: torch.nn.Module, device: str):
+    """
+    Compile a model in place with torch.compile.
+    
+    Fuses the many small kernels that dominate encoder inference on short
+    texts. The first calls pay the compile cost, which warmup absorbs.
+    Opt-in with TORCH_COMPILE=true.
+    """
+    if device != "cuda" or os.getenv("TORCH_COMPILE", "false").lower() != "true":
+        return
+    # Compiling in place keeps the module's type, which HF pipelines rely on. Default
+    # mode rather than reduce-overhead: CUDA graphs would be re-recorded for every new
+    # input length, and text lengths here vary from request to request.
+    module.compile(mode="default")
+
+
+# Pinned host copies of NER weights by model name. Reloading a model onto the GPU
+# (e.g. after clear_cache) then copies these straight to the device instead of
+# reading and parsing the checkpoint again. Kept across clear_cache on purpose.
+# Each entry holds the state dict and the non-persistent buffers it leaves out.
+_ner_weights: Dict[str, Tuple[Dict[str, torch.Tensor], Dict[str, torch.Tensor]]] = {}
+
+
+def _load_token_classifier(model_name: str, device: str):
+    """Load a token-classification model, reusing pinned weights for GPU reloads."""
+    # Page-locked memory needs a CUDA runtime, and only host->GPU copies gain from it
+    pin = device == "cuda" and _cuda_available()
+    
+    cached = _ner_weights.get(model_name) if pin else None
+    if cached is not None:
+        weights, buffers = cached
+        config = _from_pretrained(AutoConfig.from_pretrained, model_name)
+        # A meta-device skeleton allocates and initializes nothing; assign=True then
+        # binds the pinned tensors in place of its parameters
+        with torch.device("meta"):
+            model = AutoModelForTokenClassification.from_config(config)
+        model.load_state_dict(weights, assign=True)
+        # Non-persistent buffers (e.g. BERT's position_ids) would otherwise stay on meta
+        for name, tensor in buffers.items():
+            module_name, _, buffer_name = name.rpartition(".")
+            setattr(model.get_submodule(module_name), buffer_name, tensor)
+        # from_config builds the model in training mode and the pipeline never switches it
+        # off, so without this dropout stays active and scores vary from call to call
+        return model.requires_grad_(False).eval()
+    
+    # Half precision halves GPU weight memory and the CPU->GPU copy; CPU inference stays float32
+    load_kwargs = {"torch_dtype": torch.float16} if device == "cuda" else {}
+    model = _from_pretrained(AutoModelForTokenClassification.from_pretrained, model_name, **load_kwargs)
+    if pin:
+        state = model.state_dict()
+        buffers = {name: buffer for name, buffer in model.named_buffers() if name not in state}
+        _ner_weights[model_name] = tuple(
+            {name: tensor.detach().cpu().pin_memory() for name, tensor in tensors.items()}
+            for tensors in (state, buffers)
+        )
+    return model
+
+
+# Model loaders, cached per model name (and device, where the model is moved to it).
+# lru_cache does not cache exceptions, so a failed load is retried on the next call.
+@lru_cache(maxsize=None)
+def _load_ner_pipeline(model_name: str, device: str):
+    """Load a token-classification pipeline for NER."""
+    logger.info(f"Loading NER model: {model_name}")
+    tokenizer = _from_pretrained(AutoTokenizer.from_pretrained, model_name)
+    model = _load_token_classifier(model_name, device)
+    
+    # Move model to appropriate device; the copy is queued on the current stream, so it
+    # overlaps with the tokenizer/pipeline setup below (and with other models' loads)
+    if device == "cuda":
+        model = model.to(device, non_blocking=True)
+    elif os.getenv("NER_INT8", "false").lower() == "true":
+        # int8 Linear layers read a quarter of the weight bytes and use the CPU's
+        # int8 dot-product instructions, at a small cost in score precision
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    _compile(model, device)
+    
+    ner_pipeline = pipeline(
+        "ner",
+        model=model,
+        tokenizer=tokenizer,
+        aggregation_strategy="simple",
+        # Texts passed as a list are run through the model this many at a time
+        batch_size=int(os.getenv("NER_BATCH_SIZE", "16")),
+        device=0 if device == "cuda" else -1
+    )
+    _warmup(ner_pipeline, device)
+    
+    logger.info(f"NER model {model_name} loaded successfully on {device}")
+    return ner_pipeline
+
+
+# Relationship extraction only reads dependency labels and POS tags, so the
+# parser, tagger and their shared tok2vec stay while these are skipped
+_SPACY_DISABLED = ('ner', 'lemmatizer')
+
+
+@lru_cache(maxsize=None)
+def _load_spacy_model(model_name: str, disable: Tuple[str, ...]):
+    """Load a spaCy language model without the disabled pipeline components."""
+    logger.info(f"Loading spaCy model: {model_name}")
+    nlp = spacy.load(model_name, disable=list(disable))
+    logger.info(f"spaCy model {model_name} loaded successfully")
+    return nlp
+
+
+@lru_cache(maxsize=None)
+def _load_sentence_transformer(model_name: str, device: str, backend: str = "torch"):
+    """Load a sentence transformer model for semantic similarity."""
+    logger.info(f"Loading semantic model: {model_name} ({backend})")
+    if backend == "onnx":
+        # ONNX Runtime runs a fused inference graph and places the model itself
+        model = SentenceTransformer(model_name, device=device, backend="onnx")
+    else:
+        model = SentenceTransformer(model_name)
+        
+        # Move model to appropriate device
+        if device == "cuda":
+            model = model.to(device, non_blocking=True)
+        _compile(model._first_module().auto_model, device)
+    _warmup(model.encode, device)
+    
+    logger.info(f"Semantic model {model_name} loaded successfully on {device}")
+    return model
+
+
+_MODEL_LOADERS = (_load_ner_pipeline, _load_spacy_model, _load_sentence_transformer)
 
 
 class ModelManager:
@@ -34,9 +203,9 @@ class ModelManager:
         if use_gpu == "false":
             return "cpu"
         elif use_gpu == "true":
-            return "cuda" if torch.cuda.is_available() else "cpu"
+            return "cuda" if _cuda_available() else "cpu"
         else:  # auto
-            return "cuda" if torch.cuda.is_available() else "cpu"
+            return "cuda" if _cuda_available() else "cpu"
     
     def get_ner_model(self, model_name: Optional[str] = None):
         """
@@ -49,33 +218,12 @@ class ModelManager:
             Transformers pipeline for token classification
         """
         model_name = model_name or os.getenv("NER_MODEL", "dslim/bert-base-NER")
-        cache_key = f"ner_{model_name}"
-        
-        if cache_key not in _model_cache:
-            logger.info(f"Loading NER model: {model_name}")
-            try:
-                tokenizer = AutoTokenizer.from_pretrained(model_name)
-                model = AutoModelForTokenClassification.from_pretrained(model_name)
-                
-                # Move model to appropriate device
-                if self.device == "cuda":
-                    model = model.to(self.device)
-                
-                ner_pipeline = pipeline(
-                    "ner",
-                    model=model,
-                    tokenizer=tokenizer,
-                    aggregation_strategy="simple",
-                    device=0 if self.device == "cuda" else -1
-                )
-                
-                _model_cache[cache_key] = ner_pipeline
-                logger.info(f"NER model {model_name} loaded successfully on {self.device}")
-            except Exception as e:
-                logger.error(f"Failed to load NER model {model_name}: {str(e)}")
-                raise
-        
-        return _model_cache[cache_key]
+        
+        try:
+            return _load_ner_pipeline(model_name, self.device)
+        except Exception as e:
+            logger.error(f"Failed to load NER model {model_name}: {str(e)}")
+            raise
     
     def get_multilingual_ner_model(self, model_name: Optional[str] = None):
         """
@@ -91,58 +239,31 @@ class ModelManager:
             "NER_MULTILINGUAL_MODEL", 
             "xlm-roberta-large-finetuned-conll03-english"
         )
-        cache_key = f"ner_multilingual_{model_name}"
-        
-        if cache_key not in _model_cache:
-            logger.info(f"Loading multilingual NER model: {model_name}")
-            try:
-                tokenizer = AutoTokenizer.from_pretrained(model_name)
-                model = AutoModelForTokenClassification.from_pretrained(model_name)
-                
-                # Move model to appropriate device
-                if self.device == "cuda":
-                    model = model.to(self.device)
-                
-                ner_pipeline = pipeline(
-                    "ner",
-                    model=model,
-                    tokenizer=tokenizer,
-                    aggregation_strategy="simple",
-                    device=0 if self.device == "cuda" else -1
-                )
-                
-                _model_cache[cache_key] = ner_pipeline
-                logger.info(f"Multilingual NER model {model_name} loaded successfully on {self.device}")
-            except Exception as e:
-                logger.error(f"Failed to load multilingual NER model {model_name}: {str(e)}")
-                raise
-        
-        return _model_cache[cache_key]
-    
-    def get_spacy_model(self, model_name: Optional[str] = None):
+        
+        try:
+            return _load_ner_pipeline(model_name, self.device)
+        except Exception as e:
+            logger.error(f"Failed to load multilingual NER model {model_name}: {str(e)}")
+            raise
+    
+    def get_spacy_model(self, model_name: Optional[str] = None, disable: Tuple[str, ...] = _SPACY_DISABLED):
         """
         Get spaCy model with lazy loading.
         
         Args:
             model_name: Name of the spaCy model to load. Defaults to env var SPACY_MODEL.
+            disable: Pipeline components to leave out of the loaded model.
         
         Returns:
             spaCy Language model
         """
         model_name = model_name or os.getenv("SPACY_MODEL", "en_core_web_lg")
-        cache_key = f"spacy_{model_name}"
-        
-        if cache_key not in _model_cache:
-            logger.info(f"Loading spaCy model: {model_name}")
-            try:
-                nlp = spacy.load(model_name)
-                _model_cache[cache_key] = nlp
-                logger.info(f"spaCy model {model_name} loaded successfully")
-            except Exception as e:
-                logger.error(f"Failed to load spaCy model {model_name}: {str(e)}")
-                raise
         
-        return _model_cache[cache_key]
+        try:
+            return _load_spacy_model(model_name, tuple(disable))
+        except Exception as e:
+            logger.error(f"Failed to load spaCy model {model_name}: {str(e)}")
+            raise
     
     def get_semantic_model(self, model_name: Optional[str] = None):
         """
@@ -158,24 +279,12 @@ class ModelManager:
             "SEMANTIC_MODEL", 
             "sentence-transformers/all-mpnet-base-v2"
         )
-        cache_key = f"semantic_{model_name}"
-        
-        if cache_key not in _model_cache:
-            logger.info(f"Loading semantic model: {model_name}")
-            try:
-                model = SentenceTransformer(model_name)
-                
-                # Move model to appropriate device
-                if self.device == "cuda":
-                    model = model.to(self.device)
-                
-                _model_cache[cache_key] = model
-                logger.info(f"Semantic model {model_name} loaded successfully on {self.device}")
-            except Exception as e:
-                logger.error(f"Failed to load semantic model {model_name}: {str(e)}")
-                raise
-        
-        return _model_cache[cache_key]
+        
+        try:
+            return _load_sentence_transformer(model_name, self.device, os.getenv("SEMANTIC_BACKEND", "torch"))
+        except Exception as e:
+            logger.error(f"Failed to load semantic model {model_name}: {str(e)}")
+            raise
     
     def get_multilingual_semantic_model(self, model_name: Optional[str] = None):
         """
@@ -188,33 +297,61 @@ class ModelManager:
             SentenceTransformer model
         """
         model_name = model_name or "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
-        cache_key = f"semantic_multilingual_{model_name}"
-        
-        if cache_key not in _model_cache:
-            logger.info(f"Loading multilingual semantic model: {model_name}")
-            try:
-                model = SentenceTransformer(model_name)
-                
-                # Move model to appropriate device
-                if self.device == "cuda":
-                    model = model.to(self.device)
-                
-                _model_cache[cache_key] = model
-                logger.info(f"Multilingual semantic model {model_name} loaded successfully on {self.device}")
-            except Exception as e:
-                logger.error(f"Failed to load multilingual semantic model {model_name}: {str(e)}")
-                raise
-        
-        return _model_cache[cache_key]
+        
+        try:
+            return _load_sentence_transformer(model_name, self.device, os.getenv("SEMANTIC_BACKEND", "torch"))
+        except Exception as e:
+            logger.error(f"Failed to load multilingual semantic model {model_name}: {str(e)}")
+            raise
+    
+    def preload_all(self):
+        """
+        Load every model up front, in parallel.
+        
+        Overlaps checkpoint reads, CPU tensor construction and host-to-GPU
+        copies across models. A model that fails to load is logged by its
+        getter and retried on first use.
+        """
+        loaders = (
+            self.get_ner_model,
+            self.get_multilingual_ner_model,
+            self.get_spacy_model,
+            self.get_semantic_model,
+            self.get_multilingual_semantic_model,
+        )
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            wait([executor.submit(load) for load in loaders])
+        
+        if self.device == "cuda":
+            torch.cuda.synchronize()
+        logger.info("Model preload finished")
     
     def clear_cache(self):
         """Clear all cached models."""
-        global _model_cache
-        _model_cache.clear()
+        for loader in _MODEL_LOADERS:
+            loader.cache_clear()
         logger.info("Model cache cleared")
 
 
-# Global model manager instance
-model_manager = ModelManager()
+# Global model manager instance, created on first access (PEP 562) so that
+# importing this module doesn't probe for CUDA. With PRELOAD_MODELS=true that
+# first access also loads every model.
+_model_manager: Optional[ModelManager] = None
+
+# Serializes creation so concurrent first accesses build (and preload) only once
+_model_manager_lock = threading.Lock()
 
 
+def __getattr__(name: str):
+    global _model_manager
+    if name == "model_manager":
+        if _model_manager is None:
+            with _model_manager_lock:
+                # Another thread may have created it while we waited for the lock
+                if _model_manager is None:
+                    manager = ModelManager()
+                    if os.getenv("PRELOAD_MODELS", "false").lower() == "true":
+                        manager.preload_all()
+                    _model_manager = manager
+        return _model_manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,13 +6,22 @@ co-reference resolution, and confidence scoring.
 """
 
 import os
+import copy
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from functools import lru_cache
 import re
 from collections import defaultdict
 
-from models import model_manager
+import torch
+
+import models
+
+# Prefer a single Aho-Corasick pass for domain keyword matching when pyahocorasick is installed
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
@@ -43,18 +52,64 @@ CLAIM_KEYWORDS = ['best', 'number 1', '#1', 'leading', 'top rated', 'award winni
                   'fastest', 'strongest', 'most effective', 'only', 'exclusive']
 
 
+def _build_domain_automaton():
+    """
+    Compile all domain keywords into one Aho-Corasick automaton.
+    
+    Each lowercase keyword maps to (keyword, targets), where targets lists the
+    (kind, brand category, rank) entries it counts towards. rank is the
+    keyword's position in the tables above, so matches can be reported in
+    table order. Returns None when pyahocorasick is not installed.
+    """
+    if ahocorasick is None:
+        return None
+    
+    targets = defaultdict(list)
+    rank = 0
+    for category, brands in BRAND_DATABASE.items():
+        for brand in brands:
+            targets[brand].append(('brands', category, rank))
+            rank += 1
+    for kind, keywords in (('competitors', COMPETITOR_KEYWORDS),
+                           ('regulated', REGULATED_KEYWORDS),
+                           ('claims', CLAIM_KEYWORDS)):
+        for keyword in keywords:
+            targets[keyword].append((kind, None, rank))
+            rank += 1
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, keyword_targets in targets.items():
+        automaton.add_word(keyword, (keyword, tuple(keyword_targets)))
+    automaton.make_automaton()
+    return automaton
+
+
+_DOMAIN_AUTOMATON = _build_domain_automaton()
+
+
+class _RelationshipsFailed(Exception):
+    """Relationship extraction failed; carries the result without relationships."""
+    
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__("Relationship extraction failed")
+        self.result = result
+
+
 class NERService:
     """Named Entity Recognition service with ML models and relationship detection."""
     
     def __init__(self):
         self.confidence_threshold = float(os.getenv("NER_CONFIDENCE_THRESHOLD", "0.7"))
-        self.entity_cache: Dict[str, Any] = {}
         self.cache_size = int(os.getenv("CACHE_SIZE", "1000"))
+        # Per-instance LRU of extraction results, keyed by (text, language, include_relationships).
+        # Wrapping the bound method makes a reference cycle back to the instance, so a
+        # discarded service is only freed by the garbage collector; the service is a
+        # long-lived singleton, and clear_cache() releases the cached results.
+        self._extract_cached = lru_cache(maxsize=self.cache_size)(self._extract)
     
-    @lru_cache(maxsize=1000)
-    def _cached_extract(self, text: str, language: str) -> str:
-        """Cache key for entity extraction."""
-        return f"{text[:100]}_{language}"
+    def clear_cache(self):
+        """Drop all cached extraction results."""
+        self._extract_cached.cache_clear()
     
     def extract_entities(
         self, 
@@ -73,59 +128,150 @@ class NERService:
         Returns:
             Dictionary containing entities, relationships, and confidence scores
         """
+        # Blank text (empty captions, failed OCR) has nothing to find; skip the models
+        if not text or text.isspace():
+            return self._get_empty_result(language)
+        
         try:
-            # Choose appropriate NER model based on language
-            if language in ['en']:
-                ner_results = self._extract_with_transformer(text, language)
-            else:
-                ner_results = self._extract_with_multilingual_transformer(text, language)
-            
-            # Extract relationships using spaCy
-            relationships = []
-            if include_relationships:
-                relationships = self._extract_relationships(text, ner_results)
-            
-            # Extract domain-specific entities
-            domain_entities = self._extract_domain_specific(text)
-            
-            # Merge and structure results
-            structured_entities = self._structure_entities(ner_results, domain_entities)
-            
-            return {
-                'entities': structured_entities,
-                'relationships': relationships,
-                'metadata': {
-                    'language': language,
-                    'total_entities': sum(len(v) for v in structured_entities.values()),
-                    'confidence_threshold': self.confidence_threshold
-                }
-            }
+            result = self._extract_cached(text, language, include_relationships)
+        except _RelationshipsFailed as failed:
+            # Serve the entities without relationships, uncached, so the next call retries
+            logger.error(f"Relationship extraction failed: {str(failed.__cause__)}")
+            return failed.result
         except Exception as e:
             logger.error(f"Entity extraction failed: {str(e)}")
-            return {
-                'entities': self._get_empty_entities(),
-                'relationships': [],
-                'metadata': {
-                    'language': language,
-                    'total_entities': 0,
-                    'confidence_threshold': self.confidence_threshold,
-                    'error': str(e)
-                }
+            return self._get_empty_result(language, e)
+        
+        # Callers get their own copy so they can't alter the cached result
+        return copy.deepcopy(result)
+    
+    def _extract(self, text: str, language: str, include_relationships: bool) -> Dict[str, Any]:
+        """Run entity extraction; errors propagate so that failures are not cached."""
+        # Choose appropriate NER model based on language
+        if language in ['en']:
+            ner_results = self._extract_with_transformer(text, language)
+        else:
+            ner_results = self._extract_with_multilingual_transformer(text, language)
+        
+        result = self._build_result(text, ner_results, language, include_relationships=False)
+        if include_relationships:
+            try:
+                result['relationships'] = self._find_relationships(text, ner_results)
+            except Exception as e:
+                raise _RelationshipsFailed(result) from e
+        return result
+    
+    def extract_entities_batch(
+        self, 
+        texts: List[str], 
+        language: str = 'en',
+        include_relationships: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract entities from several texts, running the NER model once over the batch.
+        
+        Args:
+            texts: Input texts to extract entities from
+            language: Language code shared by all texts (en, hi, es, etc.)
+            include_relationships: Whether to extract entity relationships
+        
+        Returns:
+            One result per text, in the same format as extract_entities
+        """
+        # Blank texts get an empty result in place, as in extract_entities; only
+        # the rest go through the models
+        results = [None if text and not text.isspace() else self._get_empty_result(language) for text in texts]
+        positions = [i for i, result in enumerate(results) if result is None]
+        if not positions:
+            return results
+        texts = [texts[i] for i in positions]
+        
+        try:
+            batch_results = self._extract_batch_with_transformer(texts, language)
+        except Exception as e:
+            logger.error(f"Batch entity extraction failed: {str(e)}")
+            for i in positions:
+                results[i] = self._get_empty_result(language, e)
+            return results
+        
+        docs = [None] * len(texts)
+        if include_relationships:
+            try:
+                docs = list(models.model_manager.get_spacy_model().pipe(texts))
+            except Exception as e:
+                logger.error(f"Batch dependency parsing failed: {str(e)}")
+        
+        for i, text, ner_results, doc in zip(positions, texts, batch_results, docs):
+            try:
+                results[i] = self._build_result(text, ner_results, language, include_relationships, doc)
+            except Exception as e:
+                logger.error(f"Entity extraction failed: {str(e)}")
+                results[i] = self._get_empty_result(language, e)
+        return results
+    
+    def _build_result(
+        self, 
+        text: str, 
+        ner_results: List[Dict[str, Any]], 
+        language: str,
+        include_relationships: bool,
+        doc=None
+    ) -> Dict[str, Any]:
+        """Combine NER output with relationships and domain entities into the response format."""
+        # Extract relationships using spaCy
+        relationships = []
+        if include_relationships:
+            relationships = self._extract_relationships(text, ner_results, doc)
+        
+        # Extract domain-specific entities
+        domain_entities = self._extract_domain_specific(text)
+        
+        # Merge and structure results
+        structured_entities = self._structure_entities(ner_results, domain_entities)
+        
+        return {
+            'entities': structured_entities,
+            'relationships': relationships,
+            'metadata': {
+                'language': language,
+                'total_entities': sum(len(v) for v in structured_entities.values()),
+                'confidence_threshold': self.confidence_threshold
             }
+        }
+    
+    def _get_empty_result(self, language: str, error: Optional[Exception] = None) -> Dict[str, Any]:
+        """Result with no entities, for blank text or (with error) a failed extraction."""
+        metadata = {
+            'language': language,
+            'total_entities': 0,
+            'confidence_threshold': self.confidence_threshold
+        }
+        if error is not None:
+            metadata['error'] = str(error)
+        
+        return {
+            'entities': self._get_empty_entities(),
+            'relationships': [],
+            'metadata': metadata
+        }
+    
+    def _filter_by_confidence(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop entities scored below the confidence threshold."""
+        # Aggregated pipeline output is tens of spans, too few for numpy to beat a
+        # comprehension; a local threshold saves the attribute lookup per span
+        threshold = self.confidence_threshold
+        return [r for r in results if r.get('score', 0) >= threshold]
     
     def _extract_with_transformer(self, text: str, language: str) -> List[Dict[str, Any]]:
         """Extract entities using transformer-based NER model."""
         try:
-            ner_pipeline = model_manager.get_ner_model()
-            results = ner_pipeline(text)
+            ner_pipeline = models.model_manager.get_ner_model()
+            # Stricter than the pipeline's own no_grad: also skips autograd's view and version tracking
+            with torch.inference_mode():
+                results = ner_pipeline(text)
             
             # Filter by confidence threshold
-            filtered_results = [
-                r for r in results 
-                if r.get('score', 0) >= self.confidence_threshold
-            ]
-            
-            return filtered_results
+            return self._filter_by_confidence(results)
         except Exception as e:
             logger.error(f"Transformer NER failed: {str(e)}")
             raise e  # Re-raise the exception so it can be caught by the main method
@@ -133,60 +279,74 @@ class NERService:
     def _extract_with_multilingual_transformer(self, text: str, language: str) -> List[Dict[str, Any]]:
         """Extract entities using multilingual transformer model."""
         try:
-            ner_pipeline = model_manager.get_multilingual_ner_model()
-            results = ner_pipeline(text)
+            ner_pipeline = models.model_manager.get_multilingual_ner_model()
+            with torch.inference_mode():
+                results = ner_pipeline(text)
             
             # Filter by confidence threshold
-            filtered_results = [
-                r for r in results 
-                if r.get('score', 0) >= self.confidence_threshold
-            ]
-            
-            return filtered_results
+            return self._filter_by_confidence(results)
         except Exception as e:
             logger.error(f"Multilingual NER failed: {str(e)}")
             raise e  # Re-raise the exception so it can be caught by the main method
     
-    def _extract_relationships(self, text: str, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Extract relationships between entities using spaCy."""
+    def _extract_batch_with_transformer(self, texts: List[str], language: str) -> List[List[Dict[str, Any]]]:
+        """Extract entities from several texts with one batched pipeline call."""
+        if language in ['en']:
+            ner_pipeline = models.model_manager.get_ner_model()
+        else:
+            ner_pipeline = models.model_manager.get_multilingual_ner_model()
+        
+        # Given a list, the pipeline runs the texts in batches and returns one result list per text
+        with torch.inference_mode():
+            batch_results = ner_pipeline(texts)
+        return [self._filter_by_confidence(results) for results in batch_results]
+    
+    def _extract_relationships(self, text: str, entities: List[Dict[str, Any]], doc=None) -> List[Dict[str, Any]]:
+        """Extract relationships between entities, or none if relationship extraction fails."""
         try:
-            nlp = model_manager.get_spacy_model()
-            doc = nlp(text)
-            
-            relationships = []
-            
-            # Extract dependency-based relationships
-            for token in doc:
-                # Brand-Product relationships
-                if token.dep_ in ['poss', 'nmod'] and token.head.pos_ == 'NOUN':
-                    entity1 = token.text
-                    entity2 = token.head.text
-                    
-                    # Check if both are entities
-                    if self._is_entity(entity1, entities) and self._is_entity(entity2, entities):
-                        relationships.append({
-                            'entity1': entity1,
-                            'entity2': entity2,
-                            'type': 'possession',
-                            'confidence': 0.8
-                        })
-                
-                # Product-Price relationships
-                if token.pos_ == 'NUM' and any(child.text.lower() in ['$', 'usd', 'dollars'] for child in token.children):
-                    for child in token.head.children:
-                        if child.pos_ == 'NOUN':
-                            relationships.append({
-                                'entity1': child.text,
-                                'entity2': f"${token.text}",
-                                'type': 'product-price',
-                                'confidence': 0.9
-                            })
-            
-            return relationships
+            return self._find_relationships(text, entities, doc)
         except Exception as e:
             logger.error(f"Relationship extraction failed: {str(e)}")
             return []
     
+    def _find_relationships(self, text: str, entities: List[Dict[str, Any]], doc=None) -> List[Dict[str, Any]]:
+        """Extract relationships between entities using spaCy, reusing an already parsed doc if given."""
+        if doc is None:
+            doc = models.model_manager.get_spacy_model()(text)
+        
+        relationships = []
+        # Lowercase the entity words once, not once per token checked
+        entity_words = {entity.get('word', '').lower() for entity in entities}
+        
+        # Extract dependency-based relationships
+        for token in doc:
+            # Brand-Product relationships
+            if token.dep_ in ['poss', 'nmod'] and token.head.pos_ == 'NOUN':
+                entity1 = token.text
+                entity2 = token.head.text
+        
+                # Check if both are entities
+                if self._is_entity(entity1, entity_words) and self._is_entity(entity2, entity_words):
+                    relationships.append({
+                        'entity1': entity1,
+                        'entity2': entity2,
+                        'type': 'possession',
+                        'confidence': 0.8
+                    })
+        
+            # Product-Price relationships
+            if token.pos_ == 'NUM' and any(child.text.lower() in ['$', 'usd', 'dollars'] for child in token.children):
+                for child in token.head.children:
+                    if child.pos_ == 'NOUN':
+                        relationships.append({
+                            'entity1': child.text,
+                            'entity2': f"${token.text}",
+                            'type': 'product-price',
+                            'confidence': 0.9
+                        })
+        
+        return relationships
+    
     def _extract_domain_specific(self, text: str) -> Dict[str, List[Tuple[str, float]]]:
         """Extract domain-specific entities (brands, competitors, regulated terms)."""
         text_lower = text.lower()
@@ -197,6 +357,11 @@ class NERService:
             'claims': []
         }
         
+        # Automaton offsets index text_lower, so they only line up with text when
+        # lowercasing kept its length (it doesn't for e.g. 'İ')
+        if _DOMAIN_AUTOMATON is not None and len(text_lower) == len(text):
+            return self._match_domain_keywords(text, text_lower, domain_entities)
+        
         # Extract brands
         for category, brands in BRAND_DATABASE.items():
             for brand in brands:
@@ -230,28 +395,44 @@ class NERService:
         
         return domain_entities
     
+    def _match_domain_keywords(
+        self, 
+        text: str, 
+        text_lower: str, 
+        domain_entities: Dict[str, List[Tuple]]
+    ) -> Dict[str, List[Tuple]]:
+        """Find every domain keyword in a single pass of the Aho-Corasick automaton."""
+        matches = defaultdict(list)
+        for end, (keyword, targets) in _DOMAIN_AUTOMATON.iter(text_lower):
+            start = end - len(keyword) + 1
+            # Report the text's own casing
+            matched = text[start:end + 1]
+            for kind, category, rank in targets:
+                if kind == 'brands':
+                    matches[kind].append((rank, start, (matched, 0.95, category)))
+                elif kind == 'competitors':
+                    # Competitor keywords are reported once each, not per occurrence
+                    matches[kind].append((rank, 0, (keyword, 0.85)))
+                elif kind == 'regulated':
+                    matches[kind].append((rank, start, (matched, 0.9)))
+                else:
+                    matches[kind].append((rank, start, (matched, 0.85)))
+        
+        # The automaton yields matches by text position; report them in keyword-table
+        # order, then by position, like the per-keyword loops
+        for kind, found in matches.items():
+            entries = [entry for _, _, entry in sorted(found, key=lambda match: match[:2])]
+            domain_entities[kind] = list(dict.fromkeys(entries)) if kind == 'competitors' else entries
+        
+        return domain_entities
+    
     def _structure_entities(
         self, 
         ner_results: List[Dict[str, Any]], 
         domain_entities: Dict[str, List[Tuple]]
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Structure and merge entities from different sources."""
-        structured = {
-            'persons': [],
-            'organizations': [],
-            'locations': [],
-            'dates': [],
-            'times': [],
-            'money': [],
-            'percent': [],
-            'brands': [],
-            'products': [],
-            'influencers': [],
-            'competitors': [],
-            'regulated': [],
-            'claims': [],
-            'misc': []
-        }
+        structured = self._get_empty_entities()
         
         # Process transformer NER results
         entity_type_mapping = {
@@ -318,21 +499,19 @@ class NERService:
     
     def _deduplicate_entities(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Remove duplicate entities, keeping the one with highest confidence."""
+        # casefold() also matches caseless forms lower() misses (e.g. "STRASSE" and "straße")
         seen = {}
         for entity in entities:
-            text = entity['text'].lower()
-            if text not in seen or entity['confidence'] > seen[text]['confidence']:
-                seen[text] = entity
+            key = entity['text'].casefold()
+            best = seen.get(key)
+            if best is None or entity['confidence'] > best['confidence']:
+                seen[key] = entity
         
         return list(seen.values())
     
-    def _is_entity(self, text: str, entities: List[Dict[str, Any]]) -> bool:
-        """Check if text matches any extracted entity."""
-        text_lower = text.lower()
-        for entity in entities:
-            if entity.get('word', '').lower() == text_lower:
-                return True
-        return False
+    def _is_entity(self, text: str, entity_words: Set[str]) -> bool:
+        """Check if text matches any extracted entity, given their lowercased words."""
+        return text.lower() in entity_words
     
     def _get_empty_entities(self) -> Dict[str, List]:
         """Return empty entity structure."""
@@ -14,7 +14,7 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.cluster import AgglomerativeClustering
 from collections import defaultdict
 
-from models import model_manager
+import models
 
 logger = logging.getLogger(__name__)
 
@@ -94,9 +94,9 @@ class SemanticService:
         try:
             # Choose appropriate model based on language
             if language in ['en']:
-                model = model_manager.get_semantic_model()
+                model = models.model_manager.get_semantic_model()
             else:
-                model = model_manager.get_multilingual_semantic_model()
+                model = models.model_manager.get_multilingual_semantic_model()
             
             # Check cache for existing embeddings
             uncached_texts = []
@@ -1,20 +1,55 @@
 """
 Test configuration and fixtures for the Python worker service
+
+OMP_THREAD_LIMIT defaults to 1 for the test run: a Tesseract process per
+image beats one process fanning out OpenMP threads on small frames, and it
+keeps xdist workers from multiplying threads.
+
+MODEL_WARMUP defaults to false: models under test are mocks, so warming
+them up only adds calls; the warmup tests turn it back on.
 """
 import pytest
 import pytest_asyncio
 import asyncio
 import tempfile
+import shutil
 import os
 import io
-from unittest.mock import Mock, patch, MagicMock
+import sys
+import types
+import importlib.machinery
+from functools import lru_cache
+from unittest.mock import AsyncMock, Mock, MagicMock, create_autospec
 from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile
+import httpx
 from PIL import Image
 import numpy as np
 import soundfile as sf
 
-from main import app
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+os.environ.setdefault("MODEL_WARMUP", "false")
+
+
+def _stub_module(name, **attrs):
+    module = types.ModuleType(name)
+    # A spec keeps importlib.util.find_spec() probes (e.g. in transformers) working
+    module.__spec__ = importlib.machinery.ModuleSpec(name, None)
+    module.__dict__.update(attrs)
+    return module
+
+
+# Every test swaps out main's Whisper and Tesseract bindings, so register
+# stand-ins before main is imported instead of loading faster_whisper
+# (and ctranslate2) and pytesseract for nothing.
+sys.modules.setdefault("faster_whisper", _stub_module("faster_whisper", WhisperModel=MagicMock()))
+sys.modules.setdefault("pytesseract", _stub_module(
+    "pytesseract", image_to_string=MagicMock(), image_to_data=MagicMock(), Output=MagicMock()))
+
+import main
 from instagram_downloader import InstagramDownloader
+from language_config import get_language_whisper_params
+from whisper_loader import get_whisper_model
 
 
 @pytest.fixture(scope="session")
@@ -25,14 +60,27 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture
-def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI app under test, imported once by conftest for every module."""
+    return main.app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    """Create a test client for the FastAPI app, shared by the whole session.
+
+    Unhandled server errors come back as 500 responses instead of being
+    re-raised with their tracebacks into the test. The client is entered
+    once so every request reuses one event-loop portal rather than
+    starting a new one per call.
+    """
+    with TestClient(app, raise_server_exceptions=False) as test_client:
+        yield test_client
 
 
 @pytest_asyncio.fixture
-async def async_client():
+async def async_client(app):
     """Create an async test client for the FastAPI app."""
     from httpx import AsyncClient, ASGITransport
     transport = ASGITransport(app=app)
@@ -40,192 +88,388 @@ async def async_client():
         yield ac
 
 
+# Segments are only read by the handler, so they are built once and shared
+_MOCK_SEGMENTS = (
+    Mock(start=0.0, end=2.5, text="Hello world"),
+    Mock(start=2.5, end=5.0, text="This is a test")
+)
+
+
+def _mock_transcribe(audio, language=None, **kwargs):
+    # Return the requested language or default to "en"
+    detected_language = language if language else "en"
+    mock_info = Mock(language=detected_language)
+    return (iter(_MOCK_SEGMENTS), mock_info)
+
+
+# The mocks below are built once per session and installed per test with
+# monkeypatch; each test gets them reset and re-configured, so side effects
+# set by one test never leak into the next.
+@pytest.fixture(scope="session")
+def _whisper_model_mock():
+    # Autospec once: signature checks on every call without per-test introspection
+    return create_autospec(get_whisper_model)
+
+
 @pytest.fixture
-def mock_whisper_model():
+def mock_whisper_model(_whisper_model_mock, monkeypatch):
     """Mock Whisper model for testing."""
-    with patch('main.get_whisper_model') as mock_model:
-        def mock_transcribe(audio, language=None, **kwargs):
-            mock_segments = [
-                Mock(start=0.0, end=2.5, text="Hello world"),
-                Mock(start=2.5, end=5.0, text="This is a test")
-            ]
-            # Return the requested language or default to "en"
-            detected_language = language if language else "en"
-            mock_info = Mock(language=detected_language)
-            return (mock_segments, mock_info)
-        
-        mock_model.return_value.transcribe = mock_transcribe
-        yield mock_model
+    # An autospecced function's reset_mock() keeps side effects, so clear them here
+    _whisper_model_mock.reset_mock()
+    _whisper_model_mock.side_effect = None
+    _whisper_model_mock.return_value.reset_mock(return_value=True, side_effect=True)
+    _whisper_model_mock.return_value.transcribe.side_effect = _mock_transcribe
+    monkeypatch.setattr('main.get_whisper_model', _whisper_model_mock)
+    return _whisper_model_mock
+
+
+@pytest.fixture(autouse=True)
+def clear_cuda_probe():
+    """Re-probe CUDA in every test so patched torch.cuda.is_available() takes effect."""
+    from models import _cuda_available
+    _cuda_available.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_ner_cache():
+    """Start every test with an empty NER result cache.
+
+    The global ner_service caches results by text, so a result built from one
+    test's mock model would otherwise be served to the next test.
+    """
+    from services.ner_service import ner_service
+    ner_service.clear_cache()
+
+
+@pytest.fixture
+def mock_whisper_class(monkeypatch):
+    """Mock WhisperModel constructor with whisper_loader's cached model cleared.
+
+    monkeypatch restores both the constructor and the cached model afterwards,
+    so model-loading tests don't leave a mock model behind for later tests.
+    """
+    import whisper_loader
+    mock_whisper = Mock(return_value=Mock())
+    monkeypatch.setattr(whisper_loader, 'model', None)
+    monkeypatch.setattr(whisper_loader, 'WhisperModel', mock_whisper)
+    return mock_whisper
+
 
 @pytest.fixture
-def mock_audio_preprocessing():
+def mock_audio_preprocessing(monkeypatch):
     """Mock audio preprocessing for testing."""
-    with patch('main.preprocess_audio') as mock_preprocess:
-        mock_preprocess.return_value = b"preprocessed_audio_data"
-        yield mock_preprocess
+    mock_preprocess = Mock(return_value=b"preprocessed_audio_data")
+    monkeypatch.setattr('main.preprocess_audio', mock_preprocess)
+    return mock_preprocess
+
 
 @pytest.fixture
-def mock_text_postprocessing():
+def mock_text_postprocessing(monkeypatch):
     """Mock text post-processing for testing."""
-    with patch('main.post_process_transcript') as mock_postprocess:
-        mock_segments = [
-            {"tStart": 0.0, "tEnd": 2.5, "text": "Hello world"},
-            {"tStart": 2.5, "tEnd": 5.0, "text": "This is a test"}
-        ]
-        mock_postprocess.return_value = mock_segments
-        yield mock_postprocess
+    mock_segments = [
+        {"tStart": 0.0, "tEnd": 2.5, "text": "Hello world"},
+        {"tStart": 2.5, "tEnd": 5.0, "text": "This is a test"}
+    ]
+    mock_postprocess = Mock(return_value=mock_segments)
+    monkeypatch.setattr('main.post_process_transcript', mock_postprocess)
+    return mock_postprocess
+
+
+_MOCK_LANGUAGE_PARAMS = {
+    "initial_prompt": "This is a clear, well-spoken English audio recording.",
+    "temperature": 0.0,
+    "compression_ratio_threshold": 2.4,
+    "log_prob_threshold": -1.0,
+    "no_speech_threshold": 0.6
+}
+
+
+@pytest.fixture(scope="session")
+def _language_config_mock():
+    return create_autospec(get_language_whisper_params)
+
 
 @pytest.fixture
-def mock_language_config():
+def mock_language_config(_language_config_mock, monkeypatch):
     """Mock language configuration for testing."""
-    with patch('main.get_language_whisper_params') as mock_lang_config:
-        mock_lang_config.return_value = {
-            "initial_prompt": "This is a clear, well-spoken English audio recording.",
-            "temperature": 0.0,
-            "compression_ratio_threshold": 2.4,
-            "log_prob_threshold": -1.0,
-            "no_speech_threshold": 0.6
-        }
-        yield mock_lang_config
+    _language_config_mock.reset_mock()
+    _language_config_mock.side_effect = None
+    _language_config_mock.return_value = dict(_MOCK_LANGUAGE_PARAMS)
+    monkeypatch.setattr('main.get_language_whisper_params', _language_config_mock)
+    return _language_config_mock
 
 
 @pytest.fixture
-def mock_pytesseract():
-    """Mock pytesseract for OCR testing."""
-    with patch('main.pytesseract') as mock_tesseract:
-        mock_tesseract.image_to_string.return_value = "Sample OCR text"
-        
-        # Mock image_to_data for bounding boxes
-        mock_data = {
-            'text': ['Sample', 'OCR', 'text'],
-            'left': [10, 50, 90],
-            'top': [20, 20, 20],
-            'width': [30, 30, 30],
-            'height': [15, 15, 15],
-            'conf': [85, 90, 80]
-        }
-        mock_tesseract.image_to_data.return_value = mock_data
-        mock_tesseract.Output.DICT = 'dict'
-        
-        yield mock_tesseract
+def mock_upload_read_error(monkeypatch):
+    """Make reading any uploaded file fail.
+
+    Patched on Starlette's UploadFile, the class form parsing actually
+    instantiates; handlers only name FastAPI's subclass as an annotation.
+    """
+    mock_read = AsyncMock(side_effect=Exception("File read error"))
+    monkeypatch.setattr(UploadFile, 'read', mock_read)
+    return mock_read
+
+
+# Word-level OCR output returned by the mocked image_to_data for every image
+_MOCK_OCR_DATA = {
+    'text': ['Sample', 'OCR', 'text'],
+    'left': [10, 50, 90],
+    'top': [20, 20, 20],
+    'width': [30, 30, 30],
+    'height': [15, 15, 15],
+    'conf': [85, 90, 80]
+}
+
+
+@pytest.fixture(scope="session")
+def _pytesseract_mock():
+    return MagicMock()
 
 
 @pytest.fixture
-def sample_audio_file():
-    """Create a sample audio file for testing."""
-    # Create a simple WAV file in memory
+def mock_pytesseract(_pytesseract_mock, monkeypatch):
+    """Mock pytesseract for OCR testing."""
+    _pytesseract_mock.reset_mock(return_value=True, side_effect=True)
+    _pytesseract_mock.configure_mock(**{
+        'image_to_data.return_value': _MOCK_OCR_DATA,
+        'Output.DICT': 'dict',
+    })
+    monkeypatch.setattr('main.pytesseract', _pytesseract_mock)
+    return _pytesseract_mock
+
+
+def _build_sample_wav():
+    """Encode a 1 second 440 Hz mono sine wave as 16-bit WAV bytes."""
     import wave
-    import struct
-    
-    # Generate a simple sine wave
+
     sample_rate = 44100
     duration = 1.0  # 1 second
     frequency = 440  # A4 note
-    
-    frames = []
-    for i in range(int(sample_rate * duration)):
-        value = int(32767 * np.sin(2 * np.pi * frequency * i / sample_rate))
-        frames.append(struct.pack('<h', value))
-    
-    # Create WAV file in memory
+
+    t = np.arange(int(sample_rate * duration))
+    samples = (32767 * np.sin(2 * np.pi * frequency * t / sample_rate)).astype('<i2')
+
     wav_buffer = io.BytesIO()
     with wave.open(wav_buffer, 'wb') as wav_file:
         wav_file.setnchannels(1)  # Mono
         wav_file.setsampwidth(2)  # 16-bit
         wav_file.setframerate(sample_rate)
-        wav_file.writeframes(b''.join(frames))
-    
-    wav_buffer.seek(0)
+        wav_file.writeframes(samples.tobytes())
     return wav_buffer.getvalue()
 
 
-@pytest.fixture
-def sample_image_file():
-    """Create a sample image file for testing."""
-    # Create a simple test image with text
-    img = Image.new('RGB', (200, 100), color='white')
-    
-    # Add some text-like content (simplified)
-    pixels = np.array(img)
+def _build_sample_png():
+    """Encode a white 200x100 PNG with two black text-like bars."""
+    pixels = np.full((100, 200, 3), 255, dtype=np.uint8)
     # Add some patterns that could be interpreted as text
     pixels[20:30, 20:80] = [0, 0, 0]  # Black rectangle
     pixels[40:50, 20:80] = [0, 0, 0]  # Another black rectangle
-    
-    img = Image.fromarray(pixels)
-    
-    # Save to bytes
+
     img_buffer = io.BytesIO()
-    img.save(img_buffer, format='PNG')
-    img_buffer.seek(0)
+    Image.fromarray(pixels).save(img_buffer, format='PNG')
     return img_buffer.getvalue()
 
 
+# Encoded once at import; tests upload the bytes directly
+_SAMPLE_WAV_BYTES = _build_sample_wav()
+_SAMPLE_PNG_BYTES = _build_sample_png()
+
+
+@pytest.fixture(scope="session")
+def sample_audio_file():
+    """Create a sample audio file for testing."""
+    return _SAMPLE_WAV_BYTES
+
+
+# The /asr upload of the sample WAV is multipart-encoded once; post_asr replays it
+_ASR_UPLOAD = httpx.Request("POST", "http://test/asr", files={"file": ("test.wav", _SAMPLE_WAV_BYTES, "audio/wav")})
+_ASR_UPLOAD_BODY = _ASR_UPLOAD.read()
+_ASR_UPLOAD_HEADERS = {"content-type": _ASR_UPLOAD.headers["content-type"]}
+
+
 @pytest.fixture
-def mock_instagram_downloader():
+def post_asr(async_client):
+    """Post the sample WAV to /asr with an optional query string."""
+    async def post(query=""):
+        url = f"/asr?{query}" if query else "/asr"
+        return await async_client.post(url, content=_ASR_UPLOAD_BODY, headers=_ASR_UPLOAD_HEADERS)
+    return post
+
+
+@pytest.fixture(scope="session")
+def sample_image_file():
+    """Create a sample image file for testing."""
+    return _SAMPLE_PNG_BYTES
+
+
+_MOCK_REEL_RESULT = {
+    'video_path': '/tmp/test_video.mp4',
+    'caption': 'Test Instagram Reel',
+    'username': 'test_user',
+    'duration': 30.0,
+    'view_count': 1000,
+    'like_count': 50,
+    'upload_date': '20240101',
+    'thumbnail': 'https://example.com/thumb.jpg',
+    'webpage_url': 'https://www.instagram.com/reel/test123/'
+}
+
+
+@pytest.fixture(scope="session")
+def _instagram_downloader_specs():
+    return create_autospec(InstagramDownloader), create_autospec(InstagramDownloader, instance=True)
+
+
+@pytest.fixture(scope="class")
+def _instagram_downloader_mocks(_instagram_downloader_specs):
+    """Install one InstagramDownloader class mock and instance for a whole test class.
+
+    Per-test fixtures reset these instead of re-patching main for every test.
+    """
+    mock_downloader_class, mock_downloader = _instagram_downloader_specs
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('main.InstagramDownloader', mock_downloader_class)
+        yield mock_downloader_class, mock_downloader
+
+
+@pytest.fixture
+def mock_instagram_downloader(_instagram_downloader_mocks):
     """Mock Instagram downloader for testing."""
-    with patch('main.InstagramDownloader') as mock_downloader_class:
-        mock_downloader = Mock()
-        mock_downloader.download_reel.return_value = {
-            'video_path': '/tmp/test_video.mp4',
-            'caption': 'Test Instagram Reel',
-            'username': 'test_user',
-            'duration': 30.0,
-            'view_count': 1000,
-            'like_count': 50,
-            'upload_date': '20240101',
-            'thumbnail': 'https://example.com/thumb.jpg',
-            'webpage_url': 'https://www.instagram.com/reel/test123/'
-        }
-        mock_downloader_class.return_value = mock_downloader
-        yield mock_downloader
+    mock_downloader_class, mock_downloader = _instagram_downloader_mocks
+    mock_downloader_class.reset_mock(return_value=True, side_effect=True)
+    mock_downloader.reset_mock(return_value=True, side_effect=True)
+    mock_downloader.download_reel.return_value = dict(_MOCK_REEL_RESULT)
+    mock_downloader_class.return_value = mock_downloader
+    return mock_downloader
+
+
+@lru_cache(maxsize=None)
+def _ydl_spec():
+    """Attribute names of YoutubeDL, computed once so each spec'd mock skips the dir() walk.
+
+    yt_dlp is imported here rather than at module level so sessions that never
+    touch the downloader don't pay for it.
+    """
+    from yt_dlp import YoutubeDL
+    return dir(YoutubeDL)
+
+
+@pytest.fixture(scope="class")
+def _ydl_mocks():
+    """Install one YoutubeDL class mock and spec'd instance for a whole test class.
+
+    Per-test fixtures reset these instead of re-patching and rebuilding them.
+    """
+    mock_class = MagicMock()
+    mock_ydl = MagicMock(spec=_ydl_spec())
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('yt_dlp.YoutubeDL', mock_class)
+        yield mock_class, mock_ydl
+
+
+@pytest.fixture
+def mock_ydl_class(_ydl_mocks):
+    """Patched yt_dlp.YoutubeDL, reset for this test."""
+    mock_class, _ = _ydl_mocks
+    mock_class.reset_mock(return_value=True, side_effect=True)
+    return mock_class
 
 
 @pytest.fixture
-def temp_dir():
-    """Create a temporary directory for testing."""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    # Cleanup
-    import shutil
-    shutil.rmtree(temp_dir, ignore_errors=True)
+def mock_ydl(mock_ydl_class, _ydl_mocks):
+    """Spec'd YoutubeDL instance handed out by the patched class and its context manager."""
+    _, mock_ydl = _ydl_mocks
+    mock_ydl.reset_mock(return_value=True, side_effect=True)
+    # reset_mock clears return values, so re-wire the context manager each test;
+    # a truthy __exit__ would swallow the errors download_reel should raise
+    mock_ydl.__enter__.return_value = mock_ydl
+    mock_ydl.__exit__.return_value = False
+    mock_ydl_class.return_value = mock_ydl
+    return mock_ydl
+
+
+@pytest.fixture(scope="session")
+def _tmp_root(tmp_path_factory):
+    """Session-wide parent for per-test temp dirs, removed in one rmtree at the end.
+
+    Backed by tmp_path_factory so each pytest-xdist worker gets its own
+    base directory and parallel runs never collide.
+    """
+    root = tmp_path_factory.mktemp("session")
+    yield str(root)
+    shutil.rmtree(root, ignore_errors=True)
+
+
+@pytest.fixture(scope="class")
+def downloader_pair(_tmp_root):
+    """Two independent Instagram downloaders, each with its own temp dir, shared by a test class."""
+    return tuple(
+        InstagramDownloader(temp_dir=tempfile.mkdtemp(prefix="ig_", dir=_tmp_root))
+        for _ in range(2)
+    )
+
+
+@pytest.fixture(scope="class")
+def downloader(request, _tmp_root):
+    """InstagramDownloader working in a temp dir under the session root.
+
+    Parametrize indirectly with a dict of constructor kwargs to configure cookies.
+    download_reel keeps no per-call state on the instance, so one downloader
+    per class (and per parameter set) is shared by its tests.
+    """
+    return InstagramDownloader(
+        temp_dir=tempfile.mkdtemp(prefix="ig_", dir=_tmp_root),
+        **getattr(request, 'param', {})
+    )
 
 
 @pytest.fixture
+def temp_dir(_tmp_root):
+    """Create a temporary directory for testing.
+
+    Nested under the session root, which is removed once at session teardown
+    rather than once per test.
+    """
+    return tempfile.mkdtemp(prefix="test_", dir=_tmp_root)
+
+
+@pytest.fixture(scope="session")
 def sample_instagram_url():
     """Sample Instagram Reel URL for testing."""
     return "https://www.instagram.com/reel/ABC123DEF456/"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_instagram_response():
     """Sample Instagram download response."""
-    return {
+    return types.MappingProxyType({
         "success": True,
         "video_path": "/tmp/instagram_reel_ABC123DEF456.mp4",
         "caption": "Check out this amazing product! #fashion #style",
         "username": "fashionista",
         "duration": 30.0
-    }
+    })
 
 
-# Test data fixtures
-@pytest.fixture
+# Test data fixtures (session-scoped and read-only: built once and shared by every test)
+@pytest.fixture(scope="session")
 def asr_test_data():
     """Test data for ASR endpoint."""
-    return {
+    return types.MappingProxyType({
         "language": "en",
         "segments": [
             {"tStart": 0.0, "tEnd": 2.5, "text": "Hello world"},
             {"tStart": 2.5, "tEnd": 5.0, "text": "This is a test"}
         ],
         "timing": 1500.0
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def ocr_test_data():
     """Test data for OCR endpoint."""
-    return {
+    return types.MappingProxyType({
         "frames": [
             {
                 "t": 0,
@@ -237,10 +481,10 @@ def ocr_test_data():
             }
         ],
         "timing": 800.0
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def multilingual_audio_data():
     """Create multilingual audio data for testing."""
     # Generate audio with different characteristics for different languages
@@ -258,10 +502,10 @@ def multilingual_audio_data():
     return buffer.getvalue()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def multilingual_segments():
     """Create multilingual transcript segments for testing."""
-    return {
+    return types.MappingProxyType({
         "en": [
             {"tStart": 0.0, "tEnd": 2.5, "text": "Hello world"},
             {"tStart": 2.5, "tEnd": 5.0, "text": "This is a test"}
@@ -306,13 +550,13 @@ def multilingual_segments():
             {"tStart": 0.0, "tEnd": 2.5, "text": "안녕하세요 세계"},
             {"tStart": 2.5, "tEnd": 5.0, "text": "이것은 테스트입니다"}
         ]
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def multilingual_text_samples():
     """Create multilingual text samples for testing."""
-    return {
+    return types.MappingProxyType({
         "en": "Hello world, this is a test. How are you today?",
         "hi": "नमस्ते दुनिया, यह एक परीक्षण है। आज आप कैसे हैं?",
         "es": "Hola mundo, esta es una prueba. ¿Cómo estás hoy?",
@@ -324,4 +568,4 @@ def multilingual_text_samples():
         "zh": "你好世界，这是一个测试。你今天怎么样？",
         "ja": "こんにちは世界、これはテストです。今日はどうですか？",
         "ko": "안녕하세요 세계, 이것은 테스트입니다. 오늘 어떻게 지내세요?"
-    }
+    })
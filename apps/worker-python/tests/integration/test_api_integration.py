@@ -2,12 +2,10 @@
 Integration tests for the Python worker service API
 """
 import pytest
-import io
 import tempfile
 import os
 from unittest.mock import patch, Mock
 from fastapi.testclient import TestClient
-from main import app
 
 
 class TestAPIWorkflow:
@@ -25,7 +23,7 @@ class TestAPIWorkflow:
     def test_asr_workflow(self, client, sample_audio_file, mock_whisper_model):
         """Test complete ASR workflow."""
         # Step 1: Upload audio file
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        files = {"file": ("test.wav", sample_audio_file, "audio/wav")}
         response = client.post("/asr", files=files)
         
         assert response.status_code == 200
@@ -49,8 +47,8 @@ class TestAPIWorkflow:
         """Test complete OCR workflow."""
         # Step 1: Upload image files
         files = [
-            ("files", ("test1.png", io.BytesIO(sample_image_file), "image/png")),
-            ("files", ("test2.png", io.BytesIO(sample_image_file), "image/png"))
+            ("files", ("test1.png", sample_image_file, "image/png")),
+            ("files", ("test2.png", sample_image_file, "image/png"))
         ]
         response = client.post("/ocr", files=files)
         
@@ -121,51 +119,38 @@ class TestAPIWorkflow:
 class TestErrorHandlingWorkflow:
     """Test error handling workflows."""
     
-    def test_asr_error_workflow(self, client):
+    # The shared client returns server errors as 500 responses instead of re-raising them
+    def test_asr_error_workflow(self, client, sample_audio_file, mock_whisper_model):
         """Test ASR error handling workflow."""
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.return_value.transcribe.side_effect = Exception("Whisper error")
-            
-            # Create a dummy audio file
-            audio_data = io.BytesIO(b"fake audio data")
-            files = {"file": ("test.wav", audio_data, "audio/wav")}
-            
-            response = client.post("/asr", files=files)
-            
-            assert response.status_code == 500
-            data = response.json()
-            assert "ASR processing failed" in data["detail"]
+        mock_whisper_model.return_value.transcribe.side_effect = Exception("Whisper error")
+        
+        files = {"file": ("test.wav", sample_audio_file, "audio/wav")}
+        response = client.post("/asr", files=files)
+        
+        assert response.status_code == 500
+        assert "ASR processing failed: Whisper error" in response.json()["detail"]
     
-    def test_ocr_error_workflow(self, client):
+    def test_ocr_error_workflow(self, client, sample_image_file, mock_pytesseract):
         """Test OCR error handling workflow."""
-        with patch('main.pytesseract') as mock_tesseract:
-            mock_tesseract.image_to_string.side_effect = Exception("Tesseract error")
-            
-            # Create a dummy image file
-            image_data = io.BytesIO(b"fake image data")
-            files = {"files": ("test.png", image_data, "image/png")}
-            
-            response = client.post("/ocr", files=files)
-            
-            assert response.status_code == 500
-            data = response.json()
-            assert "OCR processing failed" in data["detail"]
+        mock_pytesseract.image_to_data.side_effect = Exception("Tesseract error")
+        
+        files = {"files": ("test.png", sample_image_file, "image/png")}
+        response = client.post("/ocr", files=files)
+        
+        assert response.status_code == 500
+        assert "OCR processing failed: Tesseract error" in response.json()["detail"]
     
-    def test_instagram_download_error_workflow(self, client, sample_instagram_url):
+    def test_instagram_download_error_workflow(self, client, sample_instagram_url, mock_instagram_downloader):
         """Test Instagram download error handling workflow."""
-        with patch('main.InstagramDownloader') as mock_downloader_class:
-            mock_downloader = Mock()
-            mock_downloader.download_reel.side_effect = Exception("Download error")
-            mock_downloader_class.return_value = mock_downloader
-            
-            request_data = {"url": sample_instagram_url}
-            response = client.post("/download-instagram", json=request_data)
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] is False
-            assert "error" in data
-            assert "Download error" in data["error"]
+        mock_instagram_downloader.download_reel.side_effect = Exception("Download error")
+        
+        response = client.post("/download-instagram", json={"url": sample_instagram_url})
+        
+        # Download failures are reported in the body rather than as an HTTP error
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is False
+        assert "Download error" in data["error"]
 
 
 class TestConcurrentRequests:
@@ -181,7 +166,7 @@ class TestConcurrentRequests:
         
         def make_request():
             try:
-                files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+                files = {"file": ("test.wav", sample_audio_file, "audio/wav")}
                 response = client.post("/asr", files=files)
                 results.append(response.status_code)
             except Exception as e:
@@ -212,7 +197,7 @@ class TestConcurrentRequests:
         
         def make_request():
             try:
-                files = {"files": ("test.png", io.BytesIO(sample_image_file), "image/png")}
+                files = {"files": ("test.png", sample_image_file, "image/png")}
                 response = client.post("/ocr", files=files)
                 results.append(response.status_code)
             except Exception as e:
@@ -243,7 +228,7 @@ class TestPerformanceWorkflow:
         import time
         
         start_time = time.time()
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        files = {"file": ("test.wav", sample_audio_file, "audio/wav")}
         response = client.post("/asr", files=files)
         end_time = time.time()
         
@@ -264,7 +249,7 @@ class TestPerformanceWorkflow:
         import time
         
         start_time = time.time()
-        files = {"files": ("test.png", io.BytesIO(sample_image_file), "image/png")}
+        files = {"files": ("test.png", sample_image_file, "image/png")}
         response = client.post("/ocr", files=files)
         end_time = time.time()
         
@@ -287,7 +272,7 @@ class TestDataValidationWorkflow:
     def test_asr_language_parameter_validation(self, client, sample_audio_file, mock_whisper_model):
         """Test ASR with different language parameters."""
         # Test with valid language
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        files = {"file": ("test.wav", sample_audio_file, "audio/wav")}
         response = client.post("/asr?language=en", files=files)
         assert response.status_code == 200
         
@@ -340,12 +325,12 @@ class TestDataValidationWorkflow:
     def test_file_type_validation(self, client, sample_image_file, mock_pytesseract):
         """Test file type validation for OCR."""
         # Test with valid image file
-        files = {"files": ("test.png", io.BytesIO(sample_image_file), "image/png")}
+        files = {"files": ("test.png", sample_image_file, "image/png")}
         response = client.post("/ocr", files=files)
         assert response.status_code == 200
         
         # Test with different image format
-        files = {"files": ("test.jpg", io.BytesIO(sample_image_file), "image/jpeg")}
+        files = {"files": ("test.jpg", sample_image_file, "image/jpeg")}
         response = client.post("/ocr", files=files)
         assert response.status_code == 200
 
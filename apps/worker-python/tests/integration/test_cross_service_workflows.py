@@ -6,7 +6,6 @@ import asyncio
 from unittest.mock import patch, Mock
 import numpy as np
 from httpx import AsyncClient, ASGITransport
-from main import app
 
 
 @pytest.mark.asyncio
@@ -15,8 +14,8 @@ class TestNERAndSemanticIntegration:
 
     async def test_ner_followed_by_semantic_clustering(self, async_client):
         """Test NER extraction followed by semantic clustering."""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_ner_model') as mock_ner, \
+             patch('models.model_manager.get_semantic_model') as mock_semantic:
             
             # Mock NER pipeline
             mock_ner_pipeline = Mock()
@@ -75,8 +74,8 @@ class TestNERAndSemanticIntegration:
 
     async def test_multilingual_ner_with_semantic_similarity(self, async_client):
         """Test multilingual NER with semantic similarity."""
-        with patch('services.ner_service.model_manager.get_multilingual_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_multilingual_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_multilingual_ner_model') as mock_ner, \
+             patch('models.model_manager.get_multilingual_semantic_model') as mock_semantic:
             
             # Mock multilingual NER pipeline
             mock_ner_pipeline = Mock()
@@ -126,8 +125,8 @@ class TestNERAndSemanticIntegration:
 
     async def test_error_recovery_across_services(self, async_client):
         """Test error recovery across service boundaries."""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_ner_model') as mock_ner, \
+             patch('models.model_manager.get_semantic_model') as mock_semantic:
             
             # Mock NER failure
             mock_ner.side_effect = Exception("NER model failed")
@@ -165,8 +164,8 @@ class TestNERAndSemanticIntegration:
 
     async def test_concurrent_ner_and_semantic_requests(self, async_client):
         """Test concurrent requests to both services."""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_ner_model') as mock_ner, \
+             patch('models.model_manager.get_semantic_model') as mock_semantic:
             
             # Mock NER pipeline
             mock_ner_pipeline = Mock()
@@ -207,8 +206,8 @@ class TestNERAndSemanticIntegration:
 
     async def test_large_text_processing_workflow(self, async_client):
         """Test processing large text with both services."""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_ner_model') as mock_ner, \
+             patch('models.model_manager.get_semantic_model') as mock_semantic:
             
             # Mock NER pipeline for large text
             mock_ner_pipeline = Mock()
@@ -275,8 +274,8 @@ class TestServicePerformanceIntegration:
 
     async def test_model_caching_across_services(self, async_client):
         """Test that models are cached across service calls."""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_ner_model') as mock_ner, \
+             patch('models.model_manager.get_semantic_model') as mock_semantic:
             
             # Mock models
             mock_ner_pipeline = Mock()
@@ -321,8 +320,8 @@ class TestServicePerformanceIntegration:
 
     async def test_memory_usage_optimization(self, async_client):
         """Test memory usage optimization across services."""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_ner_model') as mock_ner, \
+             patch('models.model_manager.get_semantic_model') as mock_semantic:
             
             # Mock models with memory tracking
             mock_ner_pipeline = Mock()
@@ -363,8 +362,8 @@ class TestErrorPropagationIntegration:
 
     async def test_ner_error_propagation_to_semantic(self, async_client):
         """Test that NER errors don't affect semantic service."""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_ner_model') as mock_ner, \
+             patch('models.model_manager.get_semantic_model') as mock_semantic:
             
             # NER fails
             mock_ner.side_effect = Exception("NER model unavailable")
@@ -400,8 +399,8 @@ class TestErrorPropagationIntegration:
 
     async def test_semantic_error_propagation_to_ner(self, async_client):
         """Test that semantic errors don't affect NER service."""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_ner_model') as mock_ner, \
+             patch('models.model_manager.get_semantic_model') as mock_semantic:
             
             # Semantic fails
             mock_semantic.side_effect = Exception("Semantic model unavailable")
@@ -436,8 +435,8 @@ class TestErrorPropagationIntegration:
 
     async def test_partial_failure_recovery(self, async_client):
         """Test recovery from partial service failures."""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_ner_model') as mock_ner, \
+             patch('models.model_manager.get_semantic_model') as mock_semantic:
             
             # Mock NER working
             mock_ner_pipeline = Mock()
@@ -500,8 +499,8 @@ class TestDataFlowIntegration:
     async def test_entity_to_keyword_flow(self, async_client):
         """Test flow from NER entities to semantic keywords."""
         # Clear model cache to ensure mocks work
-        from models import _model_cache
-        _model_cache.clear()
+        from models import model_manager
+        model_manager.clear_cache()
         
         with patch('services.ner_service.NERService.extract_entities') as mock_ner_extract, \
              patch('services.semantic_service.SemanticService.compute_similarity') as mock_semantic_compute:
@@ -594,8 +593,8 @@ class TestDataFlowIntegration:
 
     async def test_multilingual_data_flow(self, async_client):
         """Test multilingual data flow between services."""
-        with patch('services.ner_service.model_manager.get_multilingual_ner_model') as mock_ner, \
-             patch('services.semantic_service.model_manager.get_multilingual_semantic_model') as mock_semantic:
+        with patch('models.model_manager.get_multilingual_ner_model') as mock_ner, \
+             patch('models.model_manager.get_multilingual_semantic_model') as mock_semantic:
             
             # Mock multilingual NER
             mock_ner_pipeline = Mock()
@@ -15,7 +15,7 @@ class TestNEREndpoint:
     @pytest.mark.asyncio
     async def test_ner_endpoint_basic(self, async_client):
         """Test basic NER endpoint functionality"""
-        with patch('services.ner_service.model_manager.get_ner_model') as mock_ner:
+        with patch('models.model_manager.get_ner_model') as mock_ner:
             # Mock NER pipeline
             mock_pipeline = Mock()
             mock_pipeline.return_value = [
@@ -45,7 +45,7 @@ class TestNEREndpoint:
     @pytest.mark.asyncio
     async def test_ner_endpoint_multilingual(self, async_client):
         """Test NER endpoint with multilingual support"""
-        with patch('services.ner_service.model_manager.get_multilingual_ner_model') as mock_ner:
+        with patch('models.model_manager.get_multilingual_ner_model') as mock_ner:
             mock_pipeline = Mock()
             mock_pipeline.return_value = [
                 {'entity_group': 'LOC', 'word': 'Madrid', 'score': 0.88}
@@ -102,7 +102,7 @@ class TestSemanticSimilarityEndpoint:
     @pytest.mark.asyncio
     async def test_semantic_endpoint_basic(self, async_client):
         """Test basic semantic similarity endpoint"""
-        with patch('services.semantic_service.model_manager.get_semantic_model') as mock_model:
+        with patch('models.model_manager.get_semantic_model') as mock_model:
             mock_model_instance = Mock()
             mock_model_instance.encode.return_value = np.array([
                 [0.1, 0.2, 0.3],
@@ -133,7 +133,7 @@ class TestSemanticSimilarityEndpoint:
     @pytest.mark.asyncio
     async def test_semantic_endpoint_no_clustering(self, async_client):
         """Test semantic similarity without clustering"""
-        with patch('services.semantic_service.model_manager.get_semantic_model') as mock_model:
+        with patch('models.model_manager.get_semantic_model') as mock_model:
             mock_model_instance = Mock()
             mock_model_instance.encode.return_value = np.array([
                 [0.1, 0.2],
@@ -174,7 +174,7 @@ class TestSemanticSimilarityEndpoint:
     @pytest.mark.asyncio
     async def test_semantic_endpoint_multilingual(self, async_client):
         """Test semantic similarity with multilingual support"""
-        with patch('services.semantic_service.model_manager.get_multilingual_semantic_model') as mock_model:
+        with patch('models.model_manager.get_multilingual_semantic_model') as mock_model:
             mock_model_instance = Mock()
             mock_model_instance.encode.return_value = np.array([
                 [0.1, 0.2],
@@ -2,48 +2,179 @@
 Unit tests for the Instagram downloader module
 """
 import pytest
+import functools
 import os
-import tempfile
-from unittest.mock import Mock, patch, MagicMock
-from instagram_downloader import InstagramDownloader
+import types
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional
+from instagram_downloader import InstagramDownloader, InstagramDownloadError
+
+
+# Reel URL used by tests that don't care which reel is requested
+_REEL_URL = "https://www.instagram.com/reel/test123/"
+
+# Shared read-only yt-dlp info payload; tests that need different fields
+# build their own dict from it instead of mutating the shared view.
+_FORMATS = (types.MappingProxyType({'format_id': 'best'}),)
+_MOCK_INFO_BASE = types.MappingProxyType({
+    'formats': _FORMATS,
+    'description': 'Test Reel',
+    'uploader': 'test_user',
+    'duration': 30.0,
+    'view_count': 1000,
+    'like_count': 50,
+    'upload_date': '20240101',
+    'thumbnail': 'https://example.com/thumb.jpg',
+    'webpage_url': _REEL_URL
+})
+
+
+def _assert_result(result, video_path, caption='Test Reel', username='test_user',
+                   duration=30.0, view_count=1000, like_count=50):
+    """Assert the metadata fields returned by a successful download_reel call."""
+    assert result['video_path'] == video_path
+    assert result['caption'] == caption
+    assert result['username'] == username
+    assert result['duration'] == duration
+    assert result['view_count'] == view_count
+    assert result['like_count'] == like_count
+
+
+# Sentinel: the default download side effect creates the expected file
+_TOUCH = object()
+
+
+def _touch_download(path, urls):
+    """YoutubeDL.download side effect that creates an empty file at path."""
+    Path(path).touch()
+
+
+def _write_large_download(path, urls, size=19000):
+    """YoutubeDL.download side effect that creates a sizeable file at path.
+
+    The file is sized with truncate() instead of writing content into it.
+    """
+    with open(path, 'wb') as f:
+        f.truncate(size)
+
+
+def _configure_ydl(mock_ydl, info, prepared_path, downloaded_path=None, download=_TOUCH):
+    """Configure extract_info, prepare_filename and download in one configure_mock call.
+
+    By default download creates downloaded_path (falling back to prepared_path);
+    pass any other side effect, or None for a download that writes nothing.
+    """
+    if download is _TOUCH:
+        download = functools.partial(_touch_download, downloaded_path or prepared_path)
+    mock_ydl.configure_mock(**{
+        'extract_info.return_value': info,
+        'prepare_filename.return_value': prepared_path,
+        'download.side_effect': download,
+    })
+
+
+@dataclass(frozen=True)
+class _DownloadVariant:
+    """One successful download_reel scenario for test_download_reel_variants."""
+    id: str
+    downloader_kwargs: Mapping[str, Any] = field(default_factory=dict)
+    info_overrides: Mapping[str, Any] = field(default_factory=dict)
+    output_template: Optional[str] = None
+    prepared_name: str = 'test_video.mp4'
+    downloaded_name: str = 'test_video.mp4'
+    expected_opts: Mapping[str, Any] = field(default_factory=dict)
+    expected_result: Mapping[str, Any] = field(default_factory=dict)
+    file_size: int = 0
+    
+    def __post_init__(self):
+        # Variants are shared across tests (and xdist workers); expose the
+        # mapping fields read-only so no test can mutate them in place
+        for name in ('downloader_kwargs', 'info_overrides', 'expected_opts', 'expected_result'):
+            object.__setattr__(self, name, types.MappingProxyType(getattr(self, name)))
+
+
+_DOWNLOAD_VARIANTS = (
+    _DownloadVariant(
+        id='success',
+        info_overrides={'description': 'Test Instagram Reel', 'title': 'Test Reel'},
+        expected_result={'caption': 'Test Instagram Reel'},
+    ),
+    _DownloadVariant(
+        id='browser_cookies',
+        downloader_kwargs={'browser_cookies': 'chrome'},
+        expected_opts={'cookiesfrombrowser': InstagramDownloader._BROWSER_COOKIE_TUPLES['chrome']},
+    ),
+    _DownloadVariant(
+        id='cookies_file',
+        downloader_kwargs={'cookies_file': '/path/to/cookies.txt'},
+        expected_opts={'cookiefile': '/path/to/cookies.txt'},
+    ),
+    _DownloadVariant(
+        id='custom_output_path',
+        output_template='custom_video.%(ext)s',
+        prepared_name='custom_video.mp4',
+        downloaded_name='custom_video.mp4',
+    ),
+    _DownloadVariant(
+        id='large_file',
+        info_overrides={
+            'description': 'Large Test Reel',
+            'duration': 3600.0,  # 1 hour
+            'view_count': 1000000,
+            'like_count': 50000,
+            'webpage_url': 'https://www.instagram.com/reel/large123/',
+        },
+        prepared_name='large_video.mp4',
+        downloaded_name='large_video.mp4',
+        file_size=19000,
+        expected_result={
+            'caption': 'Large Test Reel',
+            'duration': 3600.0,
+            'view_count': 1000000,
+            'like_count': 50000,
+        },
+    ),
+    _DownloadVariant(
+        id='different_extensions',
+        # yt-dlp reports .mp4 but the download lands as .webm
+        downloaded_name='test_video.webm',
+    ),
+)
+
+
+def pytest_generate_tests(metafunc):
+    if 'variant' in metafunc.fixturenames:
+        # Each variant also configures the downloader fixture with its constructor kwargs
+        metafunc.parametrize(
+            'variant,downloader',
+            [(v, v.downloader_kwargs) for v in _DOWNLOAD_VARIANTS],
+            indirect=['downloader'],
+            ids=[v.id for v in _DOWNLOAD_VARIANTS],
+        )
+
+
+def _ydl_opts(mock_ydl_class):
+    """Return the options dict YoutubeDL was constructed with, asserting a single construction."""
+    mock_ydl_class.assert_called_once()
+    return mock_ydl_class.call_args.args[0]
 
 
 class TestInstagramDownloader:
     """Test the InstagramDownloader class."""
+    __slots__ = ()
     
-    def test_init_with_browser_cookies(self):
-        """Test initializing with browser cookies."""
-        downloader = InstagramDownloader(browser_cookies="chrome")
-        
-        assert downloader.browser_cookies == "chrome"
-        assert downloader.cookies_file is None
+    @pytest.mark.parametrize('downloader,browser_cookies,cookies_file', [
+        ({'browser_cookies': 'chrome'}, 'chrome', None),
+        ({'cookies_file': '/path/to/cookies.txt'}, None, '/path/to/cookies.txt'),
+        ({}, None, None),
+    ], indirect=['downloader'], ids=['browser_cookies', 'cookies_file', 'no_cookies'])
+    def test_init(self, downloader, browser_cookies, cookies_file):
+        """Test initializing with and without cookie options."""
+        assert downloader.browser_cookies == browser_cookies
+        assert downloader.cookies_file == cookies_file
         assert downloader.temp_dir is not None
         assert os.path.exists(downloader.temp_dir)
-        
-        # Cleanup
-        downloader.cleanup()
-    
-    def test_init_with_cookies_file(self):
-        """Test initializing with cookies file."""
-        downloader = InstagramDownloader(cookies_file="/path/to/cookies.txt")
-        
-        assert downloader.cookies_file == "/path/to/cookies.txt"
-        assert downloader.browser_cookies is None
-        assert downloader.temp_dir is not None
-        
-        # Cleanup
-        downloader.cleanup()
-    
-    def test_init_without_cookies(self):
-        """Test initializing without cookies."""
-        downloader = InstagramDownloader()
-        
-        assert downloader.browser_cookies is None
-        assert downloader.cookies_file is None
-        assert downloader.temp_dir is not None
-        
-        # Cleanup
-        downloader.cleanup()
     
     def test_cleanup(self):
         """Test cleanup functionality."""
@@ -52,747 +183,224 @@ class TestInstagramDownloader:
         
         assert os.path.exists(temp_dir)
         downloader.cleanup()
-        assert not os.path.exists(temp_dir)
+        assert not os.path.isdir(temp_dir)
     
-    def test_extract_reel_id_standard_url(self):
-        """Test extracting reel ID from standard Instagram URL."""
+    def test_cleanup_twice(self, monkeypatch):
+        """Test a second cleanup does not touch the filesystem again."""
         downloader = InstagramDownloader()
-        
-        url = "https://www.instagram.com/reel/ABC123DEF456/"
-        reel_id = downloader._extract_reel_id(url)
-        
-        assert reel_id == "ABC123DEF456"
         downloader.cleanup()
-    
-    def test_extract_reel_id_reels_url(self):
-        """Test extracting reel ID from reels URL."""
-        downloader = InstagramDownloader()
-        
-        url = "https://www.instagram.com/reels/XYZ789GHI012/"
-        reel_id = downloader._extract_reel_id(url)
         
-        assert reel_id == "XYZ789GHI012"
+        monkeypatch.setattr(os, 'rmdir', lambda path: pytest.fail("rmdir called after cleanup"))
         downloader.cleanup()
     
-    def test_extract_reel_id_post_url(self):
-        """Test extracting reel ID from post URL."""
-        downloader = InstagramDownloader()
+    def test_cleanup_keeps_provided_temp_dir(self, temp_dir):
+        """Test cleanup leaves a caller-provided temp dir in place."""
+        downloader = InstagramDownloader(temp_dir=temp_dir)
         
-        url = "https://www.instagram.com/p/DEF456GHI789/"
-        reel_id = downloader._extract_reel_id(url)
-        
-        assert reel_id == "DEF456GHI789"
         downloader.cleanup()
+        assert os.path.isdir(temp_dir)
+    
+    @pytest.mark.parametrize('url,expected', [
+        ("https://www.instagram.com/reel/ABC123DEF456/", "ABC123DEF456"),
+        ("https://www.instagram.com/reels/XYZ789GHI012/", "XYZ789GHI012"),
+        ("https://www.instagram.com/p/DEF456GHI789/", "DEF456GHI789"),
+        ("https://www.instagram.com/reel/ABC123", "ABC123"),
+        ("https://www.instagram.com/reel/ABC123?igsh=x#top", "ABC123"),
+        ("https://www.instagram.com/reel/ABC123.mp4", "ABC123"),
+        ("https://www.instagram.com/reel/ABC123&utm=x", "ABC123"),
+        ("https://www.instagram.com/reel/" + "A" * 80 + "/", "A" * 80),
+    ], ids=['reel', 'reels', 'post', 'no_trailing_slash', 'query_and_fragment',
+            'dot_after_id', 'ampersand_after_id', 'long_id'])
+    def test_extract_reel_id(self, url, expected):
+        """Test extracting reel ID from reel, reels and post URLs."""
+        assert InstagramDownloader._extract_reel_id(url) == expected
     
     def test_extract_reel_id_invalid_url(self):
         """Test extracting reel ID from invalid URL."""
-        downloader = InstagramDownloader()
-        
         url = "https://example.com/not-instagram"
-        reel_id = downloader._extract_reel_id(url)
+        reel_id = InstagramDownloader._extract_reel_id(url)
         
         # Should return a hash of the URL
         assert len(reel_id) == 12
         assert isinstance(reel_id, str)
-        downloader.cleanup()
-    
-    @patch('yt_dlp.YoutubeDL')
-    def test_download_reel_success(self, mock_ydl_class, temp_dir):
-        """Test successful reel download."""
-        # Mock yt-dlp response
-        mock_ydl = Mock()
-        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-        
-        # Mock video info
-        mock_info = {
-            'formats': [{'format_id': 'best'}],
-            'description': 'Test Instagram Reel',
-            'title': 'Test Reel',
-            'uploader': 'test_user',
-            'duration': 30.0,
-            'view_count': 1000,
-            'like_count': 50,
-            'upload_date': '20240101',
-            'thumbnail': 'https://example.com/thumb.jpg',
-            'webpage_url': 'https://www.instagram.com/reel/test123/'
-        }
-        mock_ydl.extract_info.return_value = mock_info
-        mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
-        
-        # Mock the download method to create the file
-        def mock_download(urls):
-            video_path = os.path.join(temp_dir, 'test_video.mp4')
-            with open(video_path, 'w') as f:
-                f.write('dummy video content')
-        mock_ydl.download.side_effect = mock_download
-        
-        downloader = InstagramDownloader()
-        result = downloader.download_reel("https://www.instagram.com/reel/test123/")
-        
-        video_path = os.path.join(temp_dir, 'test_video.mp4')
-        assert result['video_path'] == video_path
-        assert result['caption'] == 'Test Instagram Reel'
-        assert result['username'] == 'test_user'
-        assert result['duration'] == 30.0
-        assert result['view_count'] == 1000
-        assert result['like_count'] == 50
-        
-        downloader.cleanup()
     
-    @patch('yt_dlp.YoutubeDL')
-    def test_download_reel_with_browser_cookies(self, mock_ydl_class, temp_dir):
-        """Test download with browser cookies."""
-        mock_ydl = Mock()
-        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-        
-        mock_info = {
-            'formats': [{'format_id': 'best'}],
-            'description': 'Test Reel',
-            'uploader': 'test_user',
-            'duration': 30.0,
-            'view_count': 1000,
-            'like_count': 50,
-            'upload_date': '20240101',
-            'thumbnail': 'https://example.com/thumb.jpg',
-            'webpage_url': 'https://www.instagram.com/reel/test123/'
-        }
-        mock_ydl.extract_info.return_value = mock_info
-        mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
-        
-        # Create a dummy video file
-        video_path = os.path.join(temp_dir, 'test_video.mp4')
-        with open(video_path, 'w') as f:
-            f.write('dummy video content')
-        
-        downloader = InstagramDownloader(browser_cookies="chrome")
-        result = downloader.download_reel("https://www.instagram.com/reel/test123/")
-        
-        # Check that yt-dlp was called with browser cookies
-        mock_ydl_class.assert_called_once()
-        call_args = mock_ydl_class.call_args[0][0]
-        assert call_args['cookiesfrombrowser'] == ('chrome',)
-        
-        downloader.cleanup()
+    def test_download_reel_variants(self, mock_ydl_class, mock_ydl, temp_dir, variant, downloader):
+        """Test successful reel downloads across downloader and yt-dlp configurations."""
+        prepared_path = os.path.join(temp_dir, variant.prepared_name)
+        downloaded_path = os.path.join(temp_dir, variant.downloaded_name)
+        output_path = os.path.join(temp_dir, variant.output_template) if variant.output_template else None
+        
+        download = (functools.partial(_write_large_download, downloaded_path, size=variant.file_size)
+                    if variant.file_size else _TOUCH)
+        _configure_ydl(mock_ydl, {**_MOCK_INFO_BASE, **variant.info_overrides}, prepared_path,
+                       downloaded_path, download=download)
+        
+        result = downloader.download_reel(_REEL_URL, output_path)
+        
+        # Check the options yt-dlp was configured with
+        call_args = _ydl_opts(mock_ydl_class)
+        for key, value in variant.expected_opts.items():
+            assert call_args[key] == value
+        if 'cookiesfrombrowser' in variant.expected_opts:
+            # Known browsers reuse the shared tuple rather than allocating one per call
+            assert call_args['cookiesfrombrowser'] is variant.expected_opts['cookiesfrombrowser']
+        if output_path is not None:
+            assert call_args['outtmpl'] == output_path
+        
+        _assert_result(result, downloaded_path, **variant.expected_result)
     
-    @patch('yt_dlp.YoutubeDL')
-    def test_download_reel_with_cookies_file(self, mock_ydl_class, temp_dir):
-        """Test download with cookies file."""
-        mock_ydl = Mock()
-        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-        
-        mock_info = {
-            'formats': [{'format_id': 'best'}],
-            'description': 'Test Reel',
-            'uploader': 'test_user',
-            'duration': 30.0,
-            'view_count': 1000,
-            'like_count': 50,
-            'upload_date': '20240101',
-            'thumbnail': 'https://example.com/thumb.jpg',
-            'webpage_url': 'https://www.instagram.com/reel/test123/'
-        }
-        mock_ydl.extract_info.return_value = mock_info
-        mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
-        
-        # Create a dummy video file
-        video_path = os.path.join(temp_dir, 'test_video.mp4')
-        with open(video_path, 'w') as f:
-            f.write('dummy video content')
-        
-        downloader = InstagramDownloader(cookies_file="/path/to/cookies.txt")
-        result = downloader.download_reel("https://www.instagram.com/reel/test123/")
-        
-        # Check that yt-dlp was called with cookies file
-        mock_ydl_class.assert_called_once()
-        call_args = mock_ydl_class.call_args[0][0]
-        assert call_args['cookiefile'] == "/path/to/cookies.txt"
-        
-        downloader.cleanup()
-    
-    @patch('yt_dlp.YoutubeDL')
-    def test_download_reel_with_custom_output_path(self, mock_ydl_class, temp_dir):
-        """Test download with custom output path."""
-        mock_ydl = Mock()
-        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-        
-        mock_info = {
-            'formats': [{'format_id': 'best'}],
-            'description': 'Test Reel',
-            'uploader': 'test_user',
-            'duration': 30.0,
-            'view_count': 1000,
-            'like_count': 50,
-            'upload_date': '20240101',
-            'thumbnail': 'https://example.com/thumb.jpg',
-            'webpage_url': 'https://www.instagram.com/reel/test123/'
-        }
-        mock_ydl.extract_info.return_value = mock_info
-        
-        custom_path = os.path.join(temp_dir, 'custom_video.%(ext)s')
-        mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'custom_video.mp4')
-        
-        # Create a dummy video file
-        video_path = os.path.join(temp_dir, 'custom_video.mp4')
-        with open(video_path, 'w') as f:
-            f.write('dummy video content')
-        
-        downloader = InstagramDownloader()
-        result = downloader.download_reel("https://www.instagram.com/reel/test123/", custom_path)
-        
-        # Check that yt-dlp was called with custom output template
-        mock_ydl_class.assert_called_once()
-        call_args = mock_ydl_class.call_args[0][0]
-        assert call_args['outtmpl'] == custom_path
-        
-        downloader.cleanup()
-    
-    @patch('yt_dlp.YoutubeDL')
-    def test_download_reel_file_not_found(self, mock_ydl_class):
+    def test_download_reel_file_not_found(self, mock_ydl, downloader):
         """Test download when file is not found after download."""
-        mock_ydl = Mock()
-        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-        
-        mock_info = {
-            'formats': [{'format_id': 'best'}],
-            'description': 'Test Reel',
-            'uploader': 'test_user',
-            'duration': 30.0,
-            'view_count': 1000,
-            'like_count': 50,
-            'upload_date': '20240101',
-            'thumbnail': 'https://example.com/thumb.jpg',
-            'webpage_url': 'https://www.instagram.com/reel/test123/'
-        }
-        mock_ydl.extract_info.return_value = mock_info
-        mock_ydl.prepare_filename.return_value = '/nonexistent/path/video.mp4'
-        
         # Mock the download method to not create any file
-        def mock_download(urls):
-            pass  # Don't create any file
-        mock_ydl.download.side_effect = mock_download
-        
-        downloader = InstagramDownloader()
+        _configure_ydl(mock_ydl, _MOCK_INFO_BASE, '/nonexistent/path/video.mp4', download=None)
         
-        with pytest.raises(Exception, match="Downloaded file not found"):
-            downloader.download_reel("https://www.instagram.com/reel/test123/")
-        
-        downloader.cleanup()
+        with pytest.raises(InstagramDownloadError) as excinfo:
+            downloader.download_reel(_REEL_URL)
+        assert "Downloaded file not found" in str(excinfo.value)
     
-    @patch('yt_dlp.YoutubeDL')
-    def test_download_reel_yt_dlp_error(self, mock_ydl_class):
+    def test_download_reel_yt_dlp_error(self, mock_ydl, downloader):
         """Test download when yt-dlp raises an error."""
-        mock_ydl = Mock()
-        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
         mock_ydl.extract_info.side_effect = Exception("yt-dlp error")
         
-        downloader = InstagramDownloader()
-        
-        with pytest.raises(Exception, match="Instagram download failed"):
-            downloader.download_reel("https://www.instagram.com/reel/test123/")
-        
-        downloader.cleanup()
+        with pytest.raises(InstagramDownloadError):
+            downloader.download_reel(_REEL_URL)
+
+
+class TestInstagramDownloaderEdgeCases:
+    """Test edge cases for Instagram downloader."""
+    __slots__ = ()
     
-    @patch('yt_dlp.YoutubeDL')
-    def test_download_reel_different_extensions(self, mock_ydl_class, temp_dir):
-        """Test download with different file extensions."""
-        mock_ydl = Mock()
-        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
+    def test_download_reel_empty_metadata(self, mock_ydl, temp_dir, downloader):
+        """Test download with empty metadata."""
+        video_path = os.path.join(temp_dir, 'test_video.mp4')
         
+        # Mock minimal info
         mock_info = {
-            'formats': [{'format_id': 'best'}],
-            'description': 'Test Reel',
-            'uploader': 'test_user',
-            'duration': 30.0,
-            'view_count': 1000,
-            'like_count': 50,
-            'upload_date': '20240101',
-            'thumbnail': 'https://example.com/thumb.jpg',
-            'webpage_url': 'https://www.instagram.com/reel/test123/'
+            'formats': _FORMATS,
+            'description': '',
+            'title': '',
+            'uploader': '',
+            'duration': None,
+            'view_count': None,
+            'like_count': None,
+            'upload_date': '',
+            'thumbnail': '',
+            'webpage_url': ''
         }
-        mock_ydl.extract_info.return_value = mock_info
-        mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
+        _configure_ydl(mock_ydl, mock_info, video_path)
         
-        # Mock the download method to create a .webm file instead of .mp4
-        def mock_download(urls):
-            video_path = os.path.join(temp_dir, 'test_video.webm')
-            with open(video_path, 'w') as f:
-                f.write('dummy video content')
-        mock_ydl.download.side_effect = mock_download
+        result = downloader.download_reel(_REEL_URL)
         
-        downloader = InstagramDownloader()
-        result = downloader.download_reel("https://www.instagram.com/reel/test123/")
+        _assert_result(result, video_path, caption='', username='',
+                       duration=None, view_count=None, like_count=None)
+    
+    def test_download_reel_missing_formats(self, mock_ydl, temp_dir, downloader):
+        """Test download when no formats are available."""
+        video_path = os.path.join(temp_dir, 'test_video.mp4')
+        
+        # Mock info with no formats
+        _configure_ydl(mock_ydl, {**_MOCK_INFO_BASE, 'formats': ()}, video_path)
+        
+        result = downloader.download_reel(_REEL_URL)
         
-        video_path = os.path.join(temp_dir, 'test_video.webm')
         assert result['video_path'] == video_path
-        downloader.cleanup()
 
 
-class TestInstagramDownloaderEdgeCases:
-    """Test edge cases for Instagram downloader."""
-    
-    def test_download_reel_empty_metadata(self, temp_dir):
-        """Test download with empty metadata."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            
-            # Mock minimal info
-            mock_info = {
-                'formats': [{'format_id': 'best'}],
-                'description': '',
-                'title': '',
-                'uploader': '',
-                'duration': None,
-                'view_count': None,
-                'like_count': None,
-                'upload_date': '',
-                'thumbnail': '',
-                'webpage_url': ''
-            }
-            mock_ydl.extract_info.return_value = mock_info
-            mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
-            
-            # Mock the download method to create the file
-            def mock_download(urls):
-                video_path = os.path.join(temp_dir, 'test_video.mp4')
-                with open(video_path, 'w') as f:
-                    f.write('dummy video content')
-            mock_ydl.download.side_effect = mock_download
-            
-            downloader = InstagramDownloader()
-            result = downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            video_path = os.path.join(temp_dir, 'test_video.mp4')
-            assert result['video_path'] == video_path
-            assert result['caption'] == ''
-            assert result['username'] == ''
-            assert result['duration'] is None or result['duration'] == 0
-            assert result['view_count'] is None or result['view_count'] == 0
-            assert result['like_count'] is None or result['like_count'] == 0
-            
-            downloader.cleanup()
-    
-    def test_download_reel_missing_formats(self, temp_dir):
-        """Test download when no formats are available."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            
-            # Mock info with no formats
-            mock_info = {
-                'formats': [],
-                'description': 'Test Reel',
-                'uploader': 'test_user',
-                'duration': 30.0,
-                'view_count': 1000,
-                'like_count': 50,
-                'upload_date': '20240101',
-                'thumbnail': 'https://example.com/thumb.jpg',
-                'webpage_url': 'https://www.instagram.com/reel/test123/'
-            }
-            mock_ydl.extract_info.return_value = mock_info
-            mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
-            
-            # Mock the download method to create the file
-            def mock_download(urls):
-                video_path = os.path.join(temp_dir, 'test_video.mp4')
-                with open(video_path, 'w') as f:
-                    f.write('dummy video content')
-            mock_ydl.download.side_effect = mock_download
-            
-            downloader = InstagramDownloader()
-            result = downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            video_path = os.path.join(temp_dir, 'test_video.mp4')
-            assert result['video_path'] == video_path
-            downloader.cleanup()
-
-
-class TestNetworkErrorHandling:
-    """Test network error handling scenarios."""
-
-    def test_download_reel_network_timeout(self, temp_dir):
-        """Test download with network timeout."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Network timeout")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Network timeout"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-    def test_download_reel_connection_error(self, temp_dir):
-        """Test download with connection error."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = ConnectionError("Connection refused")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Connection refused"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-    def test_download_reel_dns_error(self, temp_dir):
-        """Test download with DNS resolution error."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Name or service not known")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Name or service not known"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-    def test_download_reel_rate_limited(self, temp_dir):
-        """Test download when rate limited by Instagram."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("HTTP Error 429: Too Many Requests")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: HTTP Error 429: Too Many Requests"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
+class TestExtractInfoErrorHandling:
+    """Test that yt-dlp extraction failures surface as download errors."""
+
+    @pytest.mark.parametrize('downloader,url,exc', [
+        ({}, _REEL_URL, Exception("Network timeout")),
+        ({}, _REEL_URL, ConnectionError("Connection refused")),
+        ({}, _REEL_URL, Exception("Name or service not known")),
+        ({}, _REEL_URL, Exception("HTTP Error 429: Too Many Requests")),
+        ({'cookies_file': '/path/to/corrupted_cookies.txt'}, _REEL_URL,
+         Exception("Invalid cookie file format")),
+        ({'cookies_file': '/nonexistent/cookies.txt'}, _REEL_URL,
+         FileNotFoundError("Cookie file not found")),
+        ({'browser_cookies': 'chrome'}, _REEL_URL,
+         Exception("Failed to extract browser cookies")),
+        ({}, _REEL_URL, Exception("Metadata parsing failed")),
+        ({}, "not-a-valid-url", Exception("Invalid URL format")),
+        ({}, "https://www.instagram.com/reel/private123/", Exception("Private video - login required")),
+        ({}, "https://www.instagram.com/reel/nonexistent123/", Exception("Video not found")),
+        ({}, "https://www.instagram.com/p/not-a-reel/", Exception("Unsupported URL type")),
+        ({}, _REEL_URL, Exception("Resource temporarily unavailable")),
+        ({}, _REEL_URL, MemoryError("Out of memory")),
+    ], indirect=['downloader'], ids=[
+        'network_timeout', 'connection_error', 'dns_error', 'rate_limited',
+        'cookie_file_corrupted', 'cookie_file_not_found', 'browser_cookies_failed',
+        'metadata_parsing_exception', 'invalid_url_format', 'private_video',
+        'video_not_found', 'unsupported_url', 'resource_contention', 'memory_error',
+    ])
+    def test_download_reel_extract_info_error(self, mock_ydl, downloader, url, exc):
+        """Test download when extract_info raises."""
+        mock_ydl.extract_info.side_effect = exc
+        
+        with pytest.raises(InstagramDownloadError) as excinfo:
+            downloader.download_reel(url)
+        assert str(excinfo.value) == f"Instagram download failed: {exc}"
 
 
 class TestDiskSpaceErrorHandling:
     """Test disk space and file system error handling."""
 
-    def test_download_reel_disk_full(self, temp_dir):
-        """Test download when disk is full."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            
-            mock_info = {
-                'formats': [{'format_id': 'best', 'url': 'http://example.com/video.mp4'}],
-                'description': 'Test Reel',
-                'uploader': 'test_user',
-                'duration': 30.0,
-                'view_count': 1000,
-                'like_count': 50,
-                'upload_date': '20240101',
-                'thumbnail': 'https://example.com/thumb.jpg',
-                'webpage_url': 'https://www.instagram.com/reel/test123/'
-            }
-            mock_ydl.extract_info.return_value = mock_info
-            mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
-            
-            # Mock download to raise disk full error
-            def mock_download(urls):
-                raise OSError("No space left on device")
-            mock_ydl.download.side_effect = mock_download
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: No space left on device"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-    def test_download_reel_permission_denied(self, temp_dir):
-        """Test download when permission is denied."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            
-            mock_info = {
-                'formats': [{'format_id': 'best', 'url': 'http://example.com/video.mp4'}],
-                'description': 'Test Reel',
-                'uploader': 'test_user',
-                'duration': 30.0,
-                'view_count': 1000,
-                'like_count': 50,
-                'upload_date': '20240101',
-                'thumbnail': 'https://example.com/thumb.jpg',
-                'webpage_url': 'https://www.instagram.com/reel/test123/'
-            }
-            mock_ydl.extract_info.return_value = mock_info
-            mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
-            
-            # Mock download to raise permission error
-            def mock_download(urls):
-                raise PermissionError("Permission denied")
-            mock_ydl.download.side_effect = mock_download
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Permission denied"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-
-class TestCookieErrorHandling:
-    """Test cookie-related error handling."""
-
-    def test_download_reel_cookie_file_corrupted(self, temp_dir):
-        """Test download with corrupted cookie file."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Invalid cookie file format")
-            
-            downloader = InstagramDownloader(cookies_file="/path/to/corrupted_cookies.txt")
-            with pytest.raises(Exception, match="Instagram download failed: Invalid cookie file format"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-    def test_download_reel_cookie_file_not_found(self, temp_dir):
-        """Test download when cookie file doesn't exist."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = FileNotFoundError("Cookie file not found")
-            
-            downloader = InstagramDownloader(cookies_file="/nonexistent/cookies.txt")
-            with pytest.raises(Exception, match="Instagram download failed: Cookie file not found"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-    def test_download_reel_browser_cookies_failed(self, temp_dir):
-        """Test download when browser cookie extraction fails."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Failed to extract browser cookies")
-            
-            downloader = InstagramDownloader(browser_cookies="chrome")
-            with pytest.raises(Exception, match="Instagram download failed: Failed to extract browser cookies"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
+    @pytest.mark.parametrize('exc', [
+        OSError("No space left on device"),
+        PermissionError("Permission denied"),
+    ], ids=['disk_full', 'permission_denied'])
+    def test_download_reel_write_error(self, mock_ydl, temp_dir, downloader, exc):
+        """Test download when writing the video fails."""
+        _configure_ydl(mock_ydl, _MOCK_INFO_BASE, os.path.join(temp_dir, 'test_video.mp4'), download=exc)
+        
+        with pytest.raises(InstagramDownloadError) as excinfo:
+            downloader.download_reel(_REEL_URL)
+        assert str(excinfo.value) == f"Instagram download failed: {exc}"
 
 
 class TestMetadataParsingErrors:
     """Test metadata parsing error handling."""
 
-    def test_download_reel_malformed_metadata(self, temp_dir):
+    def test_download_reel_malformed_metadata(self, mock_ydl, temp_dir, downloader):
         """Test download with malformed metadata."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            
-            # Mock info with malformed data
-            mock_info = {
-                'formats': [{'format_id': 'best', 'url': 'http://example.com/video.mp4'}],
-                'description': None,  # Malformed
-                'uploader': None,    # Malformed
-                'duration': 'invalid',  # Malformed
-                'view_count': 'invalid',  # Malformed
-                'like_count': 'invalid',  # Malformed
-                'upload_date': 'invalid',  # Malformed
-                'thumbnail': None,  # Malformed
-                'webpage_url': 'https://www.instagram.com/reel/test123/'
-            }
-            mock_ydl.extract_info.return_value = mock_info
-            mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
-            
-            # Mock the download method to create the file
-            def mock_download(urls):
-                video_path = os.path.join(temp_dir, 'test_video.mp4')
-                with open(video_path, 'w') as f:
-                    f.write('dummy video content')
-            mock_ydl.download.side_effect = mock_download
-            
-            downloader = InstagramDownloader()
-            result = downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            # Should handle malformed metadata gracefully
-            assert result['caption'] == ''
-            assert result['username'] is None
-            assert result['duration'] == 'invalid'
-            assert result['view_count'] == 'invalid'
-            assert result['like_count'] == 'invalid'
-            assert result['upload_date'] == 'invalid'
-            assert result['thumbnail'] is None
-            
-            downloader.cleanup()
-
-    def test_download_reel_metadata_parsing_exception(self, temp_dir):
-        """Test download when metadata parsing raises exception."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Metadata parsing failed")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Metadata parsing failed"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-
-class TestURLValidationErrors:
-    """Test URL validation and format error handling."""
-
-    def test_download_reel_invalid_url_format(self, temp_dir):
-        """Test download with invalid URL format."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Invalid URL format")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Invalid URL format"):
-                downloader.download_reel("not-a-valid-url")
-            
-            downloader.cleanup()
-
-    def test_download_reel_private_video(self, temp_dir):
-        """Test download with private video."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Private video - login required")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Private video - login required"):
-                downloader.download_reel("https://www.instagram.com/reel/private123/")
-            
-            downloader.cleanup()
-
-    def test_download_reel_video_not_found(self, temp_dir):
-        """Test download with video not found."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Video not found")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Video not found"):
-                downloader.download_reel("https://www.instagram.com/reel/nonexistent123/")
-            
-            downloader.cleanup()
-
-    def test_download_reel_unsupported_url(self, temp_dir):
-        """Test download with unsupported URL type."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Unsupported URL type")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Unsupported URL type"):
-                downloader.download_reel("https://www.instagram.com/p/not-a-reel/")
-            
-            downloader.cleanup()
+        video_path = os.path.join(temp_dir, 'test_video.mp4')
+        
+        # Mock info with malformed data
+        mock_info = {
+            **_MOCK_INFO_BASE,
+            'description': None,  # Malformed
+            'uploader': None,    # Malformed
+            'duration': 'invalid',  # Malformed
+            'view_count': 'invalid',  # Malformed
+            'like_count': 'invalid',  # Malformed
+            'upload_date': 'invalid',  # Malformed
+            'thumbnail': None,  # Malformed
+        }
+        _configure_ydl(mock_ydl, mock_info, video_path)
+        
+        result = downloader.download_reel(_REEL_URL)
+        
+        # Should handle malformed metadata gracefully
+        _assert_result(result, video_path, caption='', username=None,
+                       duration='invalid', view_count='invalid', like_count='invalid')
+        assert result['upload_date'] == 'invalid'
+        assert result['thumbnail'] is None
 
 
 class TestConcurrentDownloadHandling:
     """Test concurrent download handling."""
 
-    def test_download_reel_concurrent_requests(self, temp_dir):
+    def test_download_reel_concurrent_requests(self, mock_ydl, temp_dir, downloader_pair):
         """Test download with concurrent requests."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            
-            mock_info = {
-                'formats': [{'format_id': 'best', 'url': 'http://example.com/video.mp4'}],
-                'description': 'Test Reel',
-                'uploader': 'test_user',
-                'duration': 30.0,
-                'view_count': 1000,
-                'like_count': 50,
-                'upload_date': '20240101',
-                'thumbnail': 'https://example.com/thumb.jpg',
-                'webpage_url': 'https://www.instagram.com/reel/test123/'
-            }
-            mock_ydl.extract_info.return_value = mock_info
-            mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'test_video.mp4')
-            
-            # Mock the download method to create the file
-            def mock_download(urls):
-                video_path = os.path.join(temp_dir, 'test_video.mp4')
-                with open(video_path, 'w') as f:
-                    f.write('dummy video content')
-            mock_ydl.download.side_effect = mock_download
-            
-            downloader1 = InstagramDownloader()
-            downloader2 = InstagramDownloader()
-            
-            # Simulate concurrent downloads
-            result1 = downloader1.download_reel("https://www.instagram.com/reel/test123/")
-            result2 = downloader2.download_reel("https://www.instagram.com/reel/test456/")
-            
-            assert result1['video_path'] is not None
-            assert result2['video_path'] is not None
-            
-            downloader1.cleanup()
-            downloader2.cleanup()
-
-    def test_download_reel_resource_contention(self, temp_dir):
-        """Test download with resource contention."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = Exception("Resource temporarily unavailable")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Resource temporarily unavailable"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-
-class TestMemoryErrorHandling:
-    """Test memory error handling scenarios."""
-
-    def test_download_reel_memory_error(self, temp_dir):
-        """Test download with memory error."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            mock_ydl.extract_info.side_effect = MemoryError("Out of memory")
-            
-            downloader = InstagramDownloader()
-            with pytest.raises(Exception, match="Instagram download failed: Out of memory"):
-                downloader.download_reel("https://www.instagram.com/reel/test123/")
-            
-            downloader.cleanup()
-
-    def test_download_reel_large_file_handling(self, temp_dir):
-        """Test download with very large file."""
-        with patch('yt_dlp.YoutubeDL') as mock_ydl_class:
-            mock_ydl = Mock()
-            mock_ydl_class.return_value.__enter__.return_value = mock_ydl
-            
-            mock_info = {
-                'formats': [{'format_id': 'best', 'url': 'http://example.com/large_video.mp4'}],
-                'description': 'Large Test Reel',
-                'uploader': 'test_user',
-                'duration': 3600.0,  # 1 hour
-                'view_count': 1000000,
-                'like_count': 50000,
-                'upload_date': '20240101',
-                'thumbnail': 'https://example.com/thumb.jpg',
-                'webpage_url': 'https://www.instagram.com/reel/large123/'
-            }
-            mock_ydl.extract_info.return_value = mock_info
-            mock_ydl.prepare_filename.return_value = os.path.join(temp_dir, 'large_video.mp4')
-            
-            # Mock download to simulate large file processing
-            def mock_download(urls):
-                video_path = os.path.join(temp_dir, 'large_video.mp4')
-                with open(video_path, 'w') as f:
-                    f.write('large video content' * 1000)  # Simulate large file
-            mock_ydl.download.side_effect = mock_download
-            
-            downloader = InstagramDownloader()
-            result = downloader.download_reel("https://www.instagram.com/reel/large123/")
-            
-            assert result['duration'] == 3600.0
-            assert result['view_count'] == 1000000
-            assert result['like_count'] == 50000
-            
-            downloader.cleanup()
+        video_path = os.path.join(temp_dir, 'test_video.mp4')
+        
+        _configure_ydl(mock_ydl, _MOCK_INFO_BASE, video_path)
+        
+        downloader1, downloader2 = downloader_pair
+        
+        # Simulate concurrent downloads
+        result1 = downloader1.download_reel(_REEL_URL)
+        result2 = downloader2.download_reel("https://www.instagram.com/reel/test456/")
+        
+        assert result1['video_path'] is not None
+        assert result2['video_path'] is not None
@@ -3,94 +3,101 @@ Unit tests for the main FastAPI application endpoints
 """
 import pytest
 import io
-import os
-from unittest.mock import patch, Mock
-from fastapi.testclient import TestClient
-from main import app
+from unittest.mock import ANY, Mock
+
+from instagram_downloader import InstagramDownloadError
+
+
+def _status_and_body(response):
+    """Return the status code and the JSON body, parsed once."""
+    return response.status_code, response.json()
+
+
+# Expected payloads for the mocked dependencies in conftest
+EXPECTED_HEALTH = {"status": "ok", "service": "worker-python"}
+EXPECTED_ASR_SEGMENTS = [
+    {"tStart": 0.0, "tEnd": 2.5, "text": "Hello world"},
+    {"tStart": 2.5, "tEnd": 5.0, "text": "This is a test"}
+]
+EXPECTED_OCR_BOXES = [
+    {"box": [10, 20, 30, 15], "text": "Sample"},
+    {"box": [50, 20, 30, 15], "text": "OCR"},
+    {"box": [90, 20, 30, 15], "text": "text"}
+]
 
 
 class TestHealthEndpoint:
     """Test the health check endpoint."""
     
-    def test_health_check(self, client):
+    @pytest.mark.asyncio
+    async def test_health_check(self, async_client):
         """Test that health endpoint returns correct status."""
-        response = client.get("/health")
+        response = await async_client.get("/health")
         
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "ok"
-        assert data["service"] == "worker-python"
+        assert _status_and_body(response) == (200, EXPECTED_HEALTH)
 
 
 class TestASREndpoint:
     """Test the ASR (Automatic Speech Recognition) endpoint."""
     
-    def test_asr_success(self, client, sample_audio_file, mock_whisper_model, asr_test_data):
+    @pytest.mark.asyncio
+    async def test_asr_success(self, post_asr, mock_whisper_model, asr_test_data):
         """Test successful ASR processing."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr", files=files)
+        response = await post_asr()
         
-        assert response.status_code == 200
-        data = response.json()
-        assert "language" in data
-        assert "segments" in data
-        assert "timing" in data
-        assert len(data["segments"]) > 0
-        assert data["segments"][0]["text"] == "Hello world"
+        status, data = _status_and_body(response)
+        assert status == 200
+        assert data["language"] == "en"
+        assert data["segments"] == EXPECTED_ASR_SEGMENTS
+        assert data["timing"] >= 0
     
-    def test_asr_with_language(self, client, sample_audio_file, mock_whisper_model):
+    @pytest.mark.asyncio
+    async def test_asr_with_language(self, post_asr, mock_whisper_model):
         """Test ASR with specific language parameter."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=en", files=files)
+        response = await post_asr("language=en")
         
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["language"] == "en"
     
-    def test_asr_with_preprocessing(self, client, sample_audio_file, mock_whisper_model, mock_audio_preprocessing):
+    @pytest.mark.asyncio
+    async def test_asr_with_preprocessing(self, post_asr, mock_whisper_model, mock_audio_preprocessing):
         """Test ASR with audio preprocessing enabled."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        response = await post_asr("enable_preprocessing=true&preprocessing_level=standard")
         
-        response = client.post("/asr?enable_preprocessing=true&preprocessing_level=standard", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["preprocessing_enabled"] == True
         assert data["preprocessing_level"] == "standard"
         mock_audio_preprocessing.assert_called_once()
     
-    def test_asr_with_postprocessing(self, client, sample_audio_file, mock_whisper_model, mock_text_postprocessing):
+    @pytest.mark.asyncio
+    async def test_asr_with_postprocessing(self, post_asr, mock_whisper_model, mock_text_postprocessing):
         """Test ASR with text post-processing enabled."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        response = await post_asr("enable_postprocessing=true")
         
-        response = client.post("/asr?enable_postprocessing=true", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["postprocessing_enabled"] == True
         mock_text_postprocessing.assert_called_once()
     
-    def test_asr_with_language_specific_params(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
+    @pytest.mark.asyncio
+    async def test_asr_with_language_specific_params(self, post_asr, mock_whisper_model, mock_language_config):
         """Test ASR with language-specific parameters."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        response = await post_asr("language=en")
         
-        response = client.post("/asr?language=en", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["language"] == "en"
         mock_language_config.assert_called_once_with("en")
     
-    def test_asr_enhanced_response_structure(self, client, sample_audio_file, mock_whisper_model):
+    @pytest.mark.asyncio
+    async def test_asr_enhanced_response_structure(self, post_asr, mock_whisper_model):
         """Test that enhanced ASR response includes new metadata fields."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        response = await post_asr()
         
-        response = client.post("/asr", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         
         # Check original fields
         assert "language" in data
@@ -103,885 +110,629 @@ class TestASREndpoint:
         assert "postprocessing_enabled" in data
         assert "model_size" in data
         assert "compute_type" in data
-    
-    def test_asr_no_file(self, client):
-        """Test ASR endpoint without file upload."""
-        response = client.post("/asr")
-        
-        assert response.status_code == 422  # Validation error
-    
-    def test_asr_processing_error(self, client, sample_audio_file):
-        """Test ASR endpoint with processing error."""
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.return_value.transcribe.side_effect = Exception("Whisper error")
-            
-            files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-            response = client.post("/asr", files=files)
-            
-            assert response.status_code == 500
-            assert "ASR processing failed" in response.json()["detail"]
 
 
 class TestOCREndpoint:
     """Test the OCR (Optical Character Recognition) endpoint."""
     
-    def test_ocr_success(self, client, sample_image_file, mock_pytesseract, ocr_test_data):
-        """Test successful OCR processing."""
+    @pytest.mark.asyncio
+    async def test_ocr_batch(self, async_client, sample_image_file, mock_pytesseract):
+        """Test OCR over a multi-file batch in a single request."""
         files = [
-            ("files", ("test1.png", io.BytesIO(sample_image_file), "image/png")),
-            ("files", ("test2.png", io.BytesIO(sample_image_file), "image/png"))
+            ("files", (f"test{i}.png", sample_image_file, "image/png"))
+            for i in range(4)
         ]
         
-        response = client.post("/ocr", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert "frames" in data
-        assert "timing" in data
-        assert len(data["frames"]) == 2
-        assert all("boxes" in frame for frame in data["frames"])
-    
-    def test_ocr_single_file(self, client, sample_image_file, mock_pytesseract):
-        """Test OCR with single file."""
-        files = {"files": ("test.png", io.BytesIO(sample_image_file), "image/png")}
+        response = await async_client.post("/ocr", files=files)
+        
+        status, data = _status_and_body(response)
+        assert status == 200
+        assert data["timing"] >= 0
+        # Every word in the mocked output clears the confidence threshold
+        assert data["frames"] == [{"t": i, "boxes": EXPECTED_OCR_BOXES} for i in range(4)]
+        # One Tesseract run per image yields both the words and their boxes
+        assert mock_pytesseract.image_to_data.call_count == 4
+        mock_pytesseract.image_to_data.assert_called_with(
+            ANY, lang='eng', output_type=mock_pytesseract.Output.DICT)
+        mock_pytesseract.image_to_string.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_ocr_batch_preserves_frame_order(self, async_client, mock_pytesseract):
+        """Test frames OCR'd in parallel come back in upload order."""
+        from PIL import Image
+        
+        def encode(width):
+            buffer = io.BytesIO()
+            Image.new('RGB', (width, 8), color='white').save(buffer, format='PNG')
+            return buffer.getvalue()
+        
+        # Tag each frame's only word with the width of the image it came from
+        mock_pytesseract.image_to_data.side_effect = lambda image, **kwargs: {
+            'text': [str(image.width)], 'left': [0], 'top': [0],
+            'width': [image.width], 'height': [8], 'conf': [90]
+        }
+        widths = [8, 16, 24, 32, 40, 48]
+        files = [
+            ("files", (f"frame{i}.png", encode(width), "image/png"))
+            for i, width in enumerate(widths)
+        ]
         
-        response = client.post("/ocr", files=files)
+        response = await async_client.post("/ocr", files=files)
         
-        assert response.status_code == 200
-        data = response.json()
-        assert len(data["frames"]) == 1
-    
-    def test_ocr_no_files(self, client):
-        """Test OCR endpoint without file uploads."""
-        response = client.post("/ocr")
-        
-        assert response.status_code == 422  # Validation error
-    
-    def test_ocr_processing_error(self, client, sample_image_file):
-        """Test OCR endpoint with processing error."""
-        with patch('main.pytesseract') as mock_tesseract:
-            mock_tesseract.image_to_string.side_effect = Exception("Tesseract error")
-            
-            files = {"files": ("test.png", io.BytesIO(sample_image_file), "image/png")}
-            response = client.post("/ocr", files=files)
-            
-            assert response.status_code == 500
-            assert "OCR processing failed" in response.json()["detail"]
+        status, data = _status_and_body(response)
+        assert status == 200
+        frames = data["frames"]
+        assert all(frame["t"] == i for i, frame in enumerate(frames))
+        assert [frame["boxes"][0]["text"] for frame in frames] == [str(width) for width in widths]
 
 
 class TestInstagramDownloadEndpoint:
     """Test the Instagram download endpoint."""
     
-    def test_download_instagram_success(self, client, sample_instagram_url, mock_instagram_downloader):
-        """Test successful Instagram download."""
-        request_data = {
-            "url": sample_instagram_url,
-            "browser_cookies": "chrome"
-        }
-        
-        response = client.post("/download-instagram", json=request_data)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert "video_path" in data
-        assert "caption" in data
-        assert "username" in data
-        assert "duration" in data
-    
-    def test_download_instagram_with_cookies_file(self, client, sample_instagram_url, mock_instagram_downloader):
-        """Test Instagram download with cookies file."""
-        request_data = {
-            "url": sample_instagram_url,
-            "cookies_file": "/path/to/cookies.txt"
-        }
-        
-        response = client.post("/download-instagram", json=request_data)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-    
-    def test_download_instagram_without_cookies(self, client, sample_instagram_url, mock_instagram_downloader):
-        """Test Instagram download without cookies."""
-        request_data = {
-            "url": sample_instagram_url
-        }
-        
-        response = client.post("/download-instagram", json=request_data)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-    
-    def test_download_instagram_invalid_url(self, client, mock_instagram_downloader):
-        """Test Instagram download with invalid URL."""
-        mock_instagram_downloader.download_reel.side_effect = Exception("Invalid URL")
-        
-        request_data = {
-            "url": "https://invalid-url.com"
-        }
-        
-        response = client.post("/download-instagram", json=request_data)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is False
-        assert "error" in data
-    
-    def test_download_instagram_missing_url(self, client):
-        """Test Instagram download without URL."""
-        request_data = {}
-        
-        response = client.post("/download-instagram", json=request_data)
-        
-        assert response.status_code == 422  # Validation error
-    
-    def test_download_instagram_invalid_browser(self, client, sample_instagram_url):
-        """Test Instagram download with invalid browser type."""
-        request_data = {
-            "url": sample_instagram_url,
-            "browser_cookies": "invalid_browser"
-        }
+    @pytest.mark.parametrize("extra_fields, download_error", [
+        ({"browser_cookies": "chrome"}, None),
+        ({"cookies_file": "/path/to/cookies.txt"}, None),
+        ({}, None),
+        # Should still work, just with different cookie handling
+        ({"browser_cookies": "invalid_browser"}, None),
+        ({"url": ""}, InstagramDownloadError("Instagram download failed: ERROR: [generic] '' is not a valid URL")),
+    ], ids=["browser_cookies", "cookies_file", "without_cookies", "invalid_browser", "empty_url"])
+    @pytest.mark.asyncio
+    async def test_download_instagram(self, async_client, sample_instagram_url, mock_instagram_downloader,
+                                      extra_fields, download_error):
+        """Test Instagram download across cookie options and an invalid URL."""
+        mock_instagram_downloader.download_reel.side_effect = download_error
+        request_data = {"url": sample_instagram_url, **extra_fields}
         
-        response = client.post("/download-instagram", json=request_data)
+        response = await async_client.post("/download-instagram", json=request_data)
         
-        # Should still work, just with different cookie handling
-        assert response.status_code == 200
+        status, data = _status_and_body(response)
+        assert status == 200
+        assert data["success"] is (download_error is None)
+        assert {"video_path", "caption", "username", "duration"} <= data.keys()
+        mock_instagram_downloader.download_reel.assert_called_once_with(request_data["url"], None)
 
 
 class TestMultilingualASR:
     """Test multilingual ASR functionality."""
     
-    def test_asr_hindi_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with Hindi language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=hi", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "hi"
-        mock_language_config.assert_called_once_with("hi")
-    
-    def test_asr_spanish_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with Spanish language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=es", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "es"
-        mock_language_config.assert_called_once_with("es")
-    
-    def test_asr_french_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with French language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=fr", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "fr"
-        mock_language_config.assert_called_once_with("fr")
-    
-    def test_asr_german_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with German language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=de", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "de"
-        mock_language_config.assert_called_once_with("de")
-    
-    def test_asr_tamil_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with Tamil language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=ta", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "ta"
-        mock_language_config.assert_called_once_with("ta")
-    
-    def test_asr_telugu_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with Telugu language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=te", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "te"
-        mock_language_config.assert_called_once_with("te")
-    
-    def test_asr_bengali_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with Bengali language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=bn", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "bn"
-        mock_language_config.assert_called_once_with("bn")
-    
-    def test_asr_chinese_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with Chinese language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=zh", files=files)
+    # "xyz" is unsupported; Whisper still processes with the hint
+    @pytest.mark.parametrize("language", ["hi", "es", "fr", "de", "ta", "te", "bn", "zh", "ja", "ko", "xyz"])
+    @pytest.mark.asyncio
+    async def test_asr_language_hint(self, post_asr, mock_whisper_model, mock_language_config, language):
+        """Test ASR passes the language hint through to the language config."""
+        response = await post_asr(f"language={language}")
         
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "zh"
-        mock_language_config.assert_called_once_with("zh")
-    
-    def test_asr_japanese_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with Japanese language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=ja", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "ja"
-        mock_language_config.assert_called_once_with("ja")
-    
-    def test_asr_korean_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with Korean language hint."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=ko", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "ko"
-        mock_language_config.assert_called_once_with("ko")
-    
-    def test_asr_unsupported_language(self, client, sample_audio_file, mock_whisper_model, mock_language_config):
-        """Test ASR with unsupported language (should fallback to English)."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?language=xyz", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["language"] == "xyz"  # Whisper will still process with the hint
-        mock_language_config.assert_called_once_with("xyz")
+        status, data = _status_and_body(response)
+        assert status == 200
+        assert data["language"] == language
+        mock_language_config.assert_called_once_with(language)
 
 
 class TestEnhancedASRFeatures:
     """Test enhanced ASR features with preprocessing and post-processing."""
     
-    def test_asr_with_audio_preprocessing_minimal(self, client, sample_audio_file, mock_whisper_model, mock_audio_preprocessing):
+    @pytest.mark.asyncio
+    async def test_asr_with_audio_preprocessing_minimal(self, post_asr, mock_whisper_model, mock_audio_preprocessing):
         """Test ASR with minimal audio preprocessing."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        response = await post_asr("enable_preprocessing=true&preprocessing_level=minimal")
         
-        response = client.post("/asr?enable_preprocessing=true&preprocessing_level=minimal", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["preprocessing_enabled"] == True
         assert data["preprocessing_level"] == "minimal"
         mock_audio_preprocessing.assert_called_once()
     
-    def test_asr_with_audio_preprocessing_aggressive(self, client, sample_audio_file, mock_whisper_model, mock_audio_preprocessing):
+    @pytest.mark.asyncio
+    async def test_asr_with_audio_preprocessing_aggressive(self, post_asr, mock_whisper_model, mock_audio_preprocessing):
         """Test ASR with aggressive audio preprocessing."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?enable_preprocessing=true&preprocessing_level=aggressive", files=files)
+        response = await post_asr("enable_preprocessing=true&preprocessing_level=aggressive")
         
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["preprocessing_enabled"] == True
         assert data["preprocessing_level"] == "aggressive"
         mock_audio_preprocessing.assert_called_once()
     
-    def test_asr_with_text_postprocessing(self, client, sample_audio_file, mock_whisper_model, mock_text_postprocessing):
+    @pytest.mark.asyncio
+    async def test_asr_with_text_postprocessing(self, post_asr, mock_whisper_model, mock_text_postprocessing):
         """Test ASR with text post-processing enabled."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
-        response = client.post("/asr?enable_postprocessing=true", files=files)
+        response = await post_asr("enable_postprocessing=true")
         
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["postprocessing_enabled"] == True
         mock_text_postprocessing.assert_called_once()
     
-    def test_asr_with_both_preprocessing_and_postprocessing(self, client, sample_audio_file, mock_whisper_model, mock_audio_preprocessing, mock_text_postprocessing):
+    @pytest.mark.asyncio
+    async def test_asr_with_both_preprocessing_and_postprocessing(self, post_asr, mock_whisper_model, mock_audio_preprocessing, mock_text_postprocessing):
         """Test ASR with both preprocessing and post-processing enabled."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        response = await post_asr("enable_preprocessing=true&preprocessing_level=standard&enable_postprocessing=true")
         
-        response = client.post("/asr?enable_preprocessing=true&preprocessing_level=standard&enable_postprocessing=true", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["preprocessing_enabled"] == True
         assert data["preprocessing_level"] == "standard"
         assert data["postprocessing_enabled"] == True
         mock_audio_preprocessing.assert_called_once()
         mock_text_postprocessing.assert_called_once()
     
-    def test_asr_with_language_specific_preprocessing(self, client, sample_audio_file, mock_whisper_model, mock_audio_preprocessing):
+    @pytest.mark.asyncio
+    async def test_asr_with_language_specific_preprocessing(self, post_asr, mock_whisper_model, mock_audio_preprocessing):
         """Test ASR with language-specific preprocessing."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        response = await post_asr("language=hi&enable_preprocessing=true&preprocessing_level=standard")
         
-        response = client.post("/asr?language=hi&enable_preprocessing=true&preprocessing_level=standard", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["language"] == "hi"
         assert data["preprocessing_enabled"] == True
         mock_audio_preprocessing.assert_called_once()
     
-    def test_asr_with_language_specific_postprocessing(self, client, sample_audio_file, mock_whisper_model, mock_text_postprocessing):
+    @pytest.mark.asyncio
+    async def test_asr_with_language_specific_postprocessing(self, post_asr, mock_whisper_model, mock_text_postprocessing):
         """Test ASR with language-specific post-processing."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        response = await post_asr("language=es&enable_postprocessing=true")
         
-        response = client.post("/asr?language=es&enable_postprocessing=true", files=files)
-        
-        assert response.status_code == 200
-        data = response.json()
+        status, data = _status_and_body(response)
+        assert status == 200
         assert data["language"] == "es"
         assert data["postprocessing_enabled"] == True
         mock_text_postprocessing.assert_called_once()
     
-    def test_asr_environment_variable_override(self, client, sample_audio_file, mock_whisper_model):
+    @pytest.mark.asyncio
+    async def test_asr_environment_variable_override(self, post_asr, mock_whisper_model, monkeypatch):
         """Test ASR with environment variable overrides."""
-        import os
-        
-        with patch.dict(os.environ, {
-            'ASR_ENABLE_PREPROCESSING': 'true',
-            'ASR_PREPROCESSING_LEVEL': 'aggressive',
-            'ASR_ENABLE_POSTPROCESSING': 'true'
-        }):
-            files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-            
-            response = client.post("/asr", files=files)
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["preprocessing_enabled"] == True
-            assert data["preprocessing_level"] == "aggressive"
-            assert data["postprocessing_enabled"] == True
+        monkeypatch.setenv('ASR_ENABLE_PREPROCESSING', 'true')
+        monkeypatch.setenv('ASR_PREPROCESSING_LEVEL', 'aggressive')
+        monkeypatch.setenv('ASR_ENABLE_POSTPROCESSING', 'true')
+        response = await post_asr()
+        
+        status, data = _status_and_body(response)
+        assert status == 200
+        assert data["preprocessing_enabled"] == True
+        assert data["preprocessing_level"] == "aggressive"
+        assert data["postprocessing_enabled"] == True
     
-    def test_asr_parameter_override_environment_variables(self, client, sample_audio_file, mock_whisper_model):
+    @pytest.mark.asyncio
+    async def test_asr_parameter_override_environment_variables(self, post_asr, mock_whisper_model, monkeypatch):
         """Test that ASR parameters override environment variables."""
-        import os
-        
-        with patch.dict(os.environ, {
-            'ASR_ENABLE_PREPROCESSING': 'false',
-            'ASR_PREPROCESSING_LEVEL': 'minimal',
-            'ASR_ENABLE_POSTPROCESSING': 'false'
-        }):
-            files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-            
-            response = client.post("/asr?enable_preprocessing=true&preprocessing_level=aggressive&enable_postprocessing=true", files=files)
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["preprocessing_enabled"] == True
-            assert data["preprocessing_level"] == "aggressive"
-            assert data["postprocessing_enabled"] == True
-
-
-class TestWhisperModelLoading:
-    """Test Whisper model loading functionality."""
-    
-    def test_whisper_model_lazy_loading(self):
-        """Test that Whisper model is loaded lazily."""
-        import main
+        monkeypatch.setenv('ASR_ENABLE_PREPROCESSING', 'false')
+        monkeypatch.setenv('ASR_PREPROCESSING_LEVEL', 'minimal')
+        monkeypatch.setenv('ASR_ENABLE_POSTPROCESSING', 'false')
+        response = await post_asr("enable_preprocessing=true&preprocessing_level=aggressive&enable_postprocessing=true")
         
-        # Clear any cached model
-        main.model = None
-        
-        with patch('main.WhisperModel') as mock_whisper:
-            mock_whisper.return_value = Mock()
-            
-            # First call should load the model
-            model1 = main.get_whisper_model()
-            assert mock_whisper.called
-            
-            # Second call should return the same model
-            model2 = main.get_whisper_model()
-            assert model1 is model2
-            # Should not call WhisperModel again
-            assert mock_whisper.call_count == 1
+        status, data = _status_and_body(response)
+        assert status == 200
+        assert data["preprocessing_enabled"] == True
+        assert data["preprocessing_level"] == "aggressive"
+        assert data["postprocessing_enabled"] == True
+
+
+class TestErrorHandling:
+    """Test error handling across endpoints."""
     
-    def test_whisper_model_with_custom_params(self):
-        """Test Whisper model loading with custom parameters."""
-        import main
+    @pytest.mark.asyncio
+    async def test_asr_processing_error(self, async_client, sample_audio_file, mock_whisper_model):
+        """Test ASR reports a Whisper failure as a 500."""
+        mock_whisper_model.return_value.transcribe.side_effect = Exception("Whisper error")
         
-        # Clear any cached model
-        main.model = None
+        files = {"file": ("test.wav", sample_audio_file, "audio/wav")}
+        response = await async_client.post("/asr", files=files)
         
-        with patch('main.WhisperModel') as mock_whisper:
-            mock_whisper.return_value = Mock()
-            
-            # Test with custom model size and compute type
-            model = main.get_whisper_model(model_size="large-v3", compute_type="float32")
-            
-            mock_whisper.assert_called_once_with("large-v3", compute_type="float32")
+        status, data = _status_and_body(response)
+        assert status == 500
+        assert "ASR processing failed" in data["detail"]
     
-    def test_whisper_model_environment_variables(self):
-        """Test Whisper model loading with environment variables."""
-        import main
-        import os
-        
-        # Clear any cached model
-        main.model = None
-        
-        with patch('main.WhisperModel') as mock_whisper:
-            mock_whisper.return_value = Mock()
-            
-            # Set environment variables
-            with patch.dict(os.environ, {
-                'WHISPER_MODEL_SIZE': 'small',
-                'WHISPER_COMPUTE_TYPE': 'int8'
-            }):
-                model = main.get_whisper_model()
-                mock_whisper.assert_called_once_with("small", compute_type="int8")
+    @pytest.mark.asyncio
+    async def test_ocr_processing_error(self, async_client, sample_image_file, mock_pytesseract):
+        """Test OCR reports a Tesseract failure as a 500."""
+        mock_pytesseract.image_to_data.side_effect = Exception("Tesseract error")
+        
+        files = {"files": ("test.png", sample_image_file, "image/png")}
+        response = await async_client.post("/ocr", files=files)
+        
+        status, data = _status_and_body(response)
+        assert status == 500
+        assert "OCR processing failed" in data["detail"]
     
-    def test_whisper_model_invalid_params(self):
-        """Test Whisper model loading with invalid parameters."""
-        import main
+    @pytest.mark.parametrize("url,message", [
+        ("https://invalid-url.com", "Invalid URL"),
+        ("https://www.instagram.com/reel/ABC123DEF456/", "Network error"),
+    ], ids=["invalid_url", "network_error"])
+    @pytest.mark.asyncio
+    async def test_instagram_download_error(self, async_client, mock_instagram_downloader, url, message):
+        """Test the download endpoint reports failures in the response body."""
+        mock_instagram_downloader.download_reel.side_effect = Exception(message)
         
-        # Clear any cached model
-        main.model = None
+        response = await async_client.post("/download-instagram", json={"url": url})
         
-        with patch('main.WhisperModel') as mock_whisper:
-            mock_whisper.return_value = Mock()
-            
-            # Test with invalid model size (should fallback to medium)
-            model = main.get_whisper_model(model_size="invalid", compute_type="invalid")
-            mock_whisper.assert_called_once_with("medium", compute_type="float16")
-
-
-class TestErrorHandling:
-    """Test error handling across endpoints."""
+        status, data = _status_and_body(response)
+        assert status == 200
+        assert data["success"] is False
+        assert message in data["error"]
     
-    def test_asr_file_read_error(self, client):
+    @pytest.mark.asyncio
+    async def test_asr_file_read_error(self, async_client, mock_whisper_model, mock_upload_read_error):
         """Test ASR with file read error."""
-        # Create a mock file that will cause read error
-        mock_file = Mock()
-        mock_file.read.side_effect = Exception("File read error")
-        
-        with patch('main.UploadFile', return_value=mock_file):
-            files = {"file": ("test.wav", io.BytesIO(b"fake audio"), "audio/wav")}
-            response = client.post("/asr", files=files)
-            
-            assert response.status_code == 500
-    
-    def test_ocr_image_processing_error(self, client):
-        """Test OCR with image processing error."""
-        # Create invalid image data
-        invalid_image = io.BytesIO(b"not an image")
+        files = {"file": ("test.wav", b"fake audio", "audio/wav")}
+        response = await async_client.post("/asr", files=files)
+        
+        status, data = _status_and_body(response)
+        assert status == 500
+        assert data["detail"] == "ASR processing failed: File read error"
+        mock_upload_read_error.assert_awaited_once()
+        mock_whisper_model.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_ocr_image_processing_error(self, async_client, sample_image_file, mock_pytesseract, monkeypatch):
+        """Test OCR wraps image decoding errors in a 500."""
+        import main
+        monkeypatch.setattr(main.Image, "open", Mock(side_effect=OSError("cannot identify image file")))
         
-        files = {"files": ("test.png", invalid_image, "image/png")}
-        response = client.post("/ocr", files=files)
+        files = {"files": ("test.png", sample_image_file, "image/png")}
+        response = await async_client.post("/ocr", files=files)
         
-        assert response.status_code == 500
-    
-    def test_instagram_download_network_error(self, client, sample_instagram_url):
-        """Test Instagram download with network error."""
-        with patch('main.InstagramDownloader') as mock_downloader_class:
-            mock_downloader = Mock()
-            mock_downloader.download_reel.side_effect = Exception("Network error")
-            mock_downloader_class.return_value = mock_downloader
-            
-            request_data = {"url": sample_instagram_url}
-            response = client.post("/download-instagram", json=request_data)
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] is False
-            assert "Network error" in data["error"]
+        status, data = _status_and_body(response)
+        assert status == 500
+        assert "OCR processing failed: cannot identify image file" in data["detail"]
+        mock_pytesseract.image_to_data.assert_not_called()
 
 
 class TestRequestValidation:
     """Test request validation and edge cases."""
     
-    def test_asr_empty_file(self, client):
+    @pytest.mark.parametrize("endpoint,request_kwargs", [
+        ("/asr", {}),
+        ("/ocr", {}),
+        ("/download-instagram", {"json": {}}),
+    ], ids=["asr_no_file", "ocr_no_files", "instagram_missing_url"])
+    @pytest.mark.asyncio
+    async def test_missing_required_input(self, async_client, endpoint, request_kwargs):
+        """Test endpoints reject requests without their required input."""
+        response = await async_client.post(endpoint, **request_kwargs)
+        
+        assert response.status_code == 422  # Validation error
+    
+    @pytest.mark.asyncio
+    async def test_asr_empty_file(self, async_client):
         """Test ASR with empty file."""
-        empty_file = io.BytesIO(b"")
-        files = {"file": ("empty.wav", empty_file, "audio/wav")}
+        files = {"file": ("empty.wav", b"", "audio/wav")}
         
-        response = client.post("/asr", files=files)
+        response = await async_client.post("/asr", files=files)
         
         # Should handle empty file gracefully
         assert response.status_code in [200, 500]  # Depends on implementation
-    
-    def test_ocr_unsupported_image_format(self, client):
-        """Test OCR with unsupported image format."""
-        # Create a file with unsupported format
-        unsupported_file = io.BytesIO(b"not an image")
-        files = {"files": ("test.txt", unsupported_file, "text/plain")}
-        
-        response = client.post("/ocr", files=files)
-        
-        assert response.status_code == 500
-    
-    def test_instagram_download_empty_url(self, client):
-        """Test Instagram download with empty URL."""
-        request_data = {"url": ""}
-        
-        response = client.post("/download-instagram", json=request_data)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is False
 
 
 class TestWhisperModelEdgeCases:
     """Test Whisper model edge cases and error handling."""
 
-    def test_whisper_model_invalid_size(self, client, sample_audio_file):
+    @pytest.mark.asyncio
+    async def test_whisper_model_invalid_size(self, post_asr, mock_whisper_model):
         """Test Whisper model with invalid size parameter."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        mock_whisper_model.side_effect = Exception("Invalid model size")
         
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.side_effect = Exception("Invalid model size")
-            
-            response = client.post("/asr", files=files)
-            assert response.status_code == 500
+        response = await post_asr()
+        assert response.status_code == 500
 
-    def test_whisper_model_loading_timeout(self, client, sample_audio_file):
+    @pytest.mark.asyncio
+    async def test_whisper_model_loading_timeout(self, post_asr, mock_whisper_model):
         """Test Whisper model loading timeout."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        mock_whisper_model.side_effect = TimeoutError("Model loading timeout")
         
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.side_effect = TimeoutError("Model loading timeout")
-            
-            response = client.post("/asr", files=files)
-            assert response.status_code == 500
+        response = await post_asr()
+        assert response.status_code == 500
 
-    def test_whisper_model_memory_error(self, client, sample_audio_file):
+    @pytest.mark.asyncio
+    async def test_whisper_model_memory_error(self, post_asr, mock_whisper_model):
         """Test Whisper model memory error."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        mock_whisper_model.side_effect = RuntimeError("CUDA out of memory")
         
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.side_effect = RuntimeError("CUDA out of memory")
-            
-            response = client.post("/asr", files=files)
-            assert response.status_code == 500
+        response = await post_asr()
+        assert response.status_code == 500
 
-    def test_whisper_model_corrupted_audio(self, client):
+    @pytest.mark.asyncio
+    async def test_whisper_model_corrupted_audio(self, async_client, mock_whisper_model):
         """Test Whisper model with corrupted audio data."""
         corrupted_audio = b"not audio data"
-        files = {"file": ("test.wav", io.BytesIO(corrupted_audio), "audio/wav")}
+        files = {"file": ("test.wav", corrupted_audio, "audio/wav")}
         
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.return_value.transcribe.side_effect = Exception("Invalid audio format")
-            
-            response = client.post("/asr", files=files)
-            assert response.status_code == 500
+        mock_whisper_model.return_value.transcribe.side_effect = Exception("Invalid audio format")
+        
+        response = await async_client.post("/asr", files=files)
+        assert response.status_code == 500
 
-    def test_whisper_model_very_large_audio(self, client):
+    @pytest.mark.asyncio
+    async def test_whisper_model_very_large_audio(self, async_client, mock_whisper_model):
         """Test Whisper model with very large audio file."""
         # Create a large audio file (simulate)
         large_audio = b"fake audio data" * 10000
-        files = {"file": ("large.wav", io.BytesIO(large_audio), "audio/wav")}
+        files = {"file": ("large.wav", large_audio, "audio/wav")}
+        
+        mock_whisper_model.return_value.transcribe.side_effect = Exception("Audio too large")
         
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.return_value.transcribe.side_effect = Exception("Audio too large")
-            
-            response = client.post("/asr", files=files)
-            assert response.status_code == 500
+        response = await async_client.post("/asr", files=files)
+        assert response.status_code == 500
 
 
 class TestASREdgeCases:
     """Test ASR endpoint edge cases and error handling."""
 
-    def test_asr_empty_audio_file(self, client):
+    @pytest.mark.asyncio
+    async def test_asr_empty_audio_file(self, async_client):
         """Test ASR with empty audio file."""
-        empty_file = io.BytesIO(b"")
-        files = {"file": ("empty.wav", empty_file, "audio/wav")}
+        files = {"file": ("empty.wav", b"", "audio/wav")}
         
-        response = client.post("/asr", files=files)
+        response = await async_client.post("/asr", files=files)
         assert response.status_code in [200, 500]  # Depends on implementation
 
-    def test_asr_unsupported_audio_format(self, client):
+    @pytest.mark.asyncio
+    async def test_asr_unsupported_audio_format(self, async_client):
         """Test ASR with unsupported audio format."""
         unsupported_audio = b"not audio data"
-        files = {"file": ("test.txt", io.BytesIO(unsupported_audio), "text/plain")}
+        files = {"file": ("test.txt", unsupported_audio, "text/plain")}
         
-        response = client.post("/asr", files=files)
+        response = await async_client.post("/asr", files=files)
         assert response.status_code == 500
 
-    def test_asr_very_long_audio(self, client):
+    @pytest.mark.asyncio
+    async def test_asr_very_long_audio(self, async_client, mock_whisper_model):
         """Test ASR with very long audio file."""
         # Simulate very long audio
         long_audio = b"fake audio data" * 100000
-        files = {"file": ("long.wav", io.BytesIO(long_audio), "audio/wav")}
+        files = {"file": ("long.wav", long_audio, "audio/wav")}
+        
+        mock_whisper_model.return_value.transcribe.side_effect = Exception("Audio too long")
         
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.return_value.transcribe.side_effect = Exception("Audio too long")
-            
-            response = client.post("/asr", files=files)
-            assert response.status_code == 500
+        response = await async_client.post("/asr", files=files)
+        assert response.status_code == 500
 
-    def test_asr_preprocessing_failure(self, client, sample_audio_file):
+    @pytest.mark.asyncio
+    async def test_asr_preprocessing_failure(self, post_asr, mock_audio_preprocessing):
         """Test ASR when preprocessing fails."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        mock_audio_preprocessing.side_effect = Exception("Preprocessing failed")
         
-        with patch('main.preprocess_audio') as mock_preprocess:
-            mock_preprocess.side_effect = Exception("Preprocessing failed")
-            
-            response = client.post("/asr?enable_preprocessing=true", files=files)
-            assert response.status_code == 500
+        response = await post_asr("enable_preprocessing=true")
+        assert response.status_code == 500
 
-    def test_asr_postprocessing_failure(self, client, sample_audio_file, mock_whisper_model):
+    @pytest.mark.asyncio
+    async def test_asr_postprocessing_failure(self, post_asr, mock_whisper_model, mock_text_postprocessing):
         """Test ASR when postprocessing fails."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        mock_text_postprocessing.side_effect = Exception("Postprocessing failed")
         
-        with patch('main.post_process_transcript') as mock_postprocess:
-            mock_postprocess.side_effect = Exception("Postprocessing failed")
-            
-            response = client.post("/asr?enable_postprocessing=true", files=files)
-            assert response.status_code == 500
+        response = await post_asr("enable_postprocessing=true")
+        assert response.status_code == 500
 
-    def test_asr_language_config_failure(self, client, sample_audio_file):
+    @pytest.mark.asyncio
+    async def test_asr_language_config_failure(self, post_asr, mock_language_config):
         """Test ASR when language configuration fails."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
+        mock_language_config.side_effect = Exception("Language config failed")
         
-        with patch('main.get_language_whisper_params') as mock_lang_config:
-            mock_lang_config.side_effect = Exception("Language config failed")
-            
-            response = client.post("/asr?language=hi", files=files)
-            assert response.status_code == 500
+        response = await post_asr("language=hi")
+        assert response.status_code == 500
 
-    def test_asr_concurrent_requests(self, client, sample_audio_file, mock_whisper_model):
+    @pytest.mark.asyncio
+    async def test_asr_concurrent_requests(self, post_asr, mock_whisper_model):
         """Test ASR with concurrent requests."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
         # This would need to be tested with actual concurrent requests
         # For now, just test that the endpoint can handle multiple calls
-        response1 = client.post("/asr", files=files)
-        response2 = client.post("/asr", files=files)
+        response1 = await post_asr()
+        response2 = await post_asr()
         
         assert response1.status_code == 200
         assert response2.status_code == 200
 
-    def test_asr_malformed_audio_headers(self, client):
+    @pytest.mark.asyncio
+    async def test_asr_malformed_audio_headers(self, async_client, mock_whisper_model):
         """Test ASR with malformed audio file headers."""
         malformed_audio = b"RIFF\x00\x00\x00\x00WAVE"  # Incomplete WAV header
-        files = {"file": ("malformed.wav", io.BytesIO(malformed_audio), "audio/wav")}
+        files = {"file": ("malformed.wav", malformed_audio, "audio/wav")}
         
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.return_value.transcribe.side_effect = Exception("Invalid audio format")
-            
-            response = client.post("/asr", files=files)
-            assert response.status_code == 500
+        mock_whisper_model.return_value.transcribe.side_effect = Exception("Invalid audio format")
+        
+        response = await async_client.post("/asr", files=files)
+        assert response.status_code == 500
 
 
 class TestOCREdgeCases:
     """Test OCR endpoint edge cases and error handling."""
 
-    def test_ocr_corrupted_image_file(self, client):
+    @pytest.mark.asyncio
+    async def test_ocr_corrupted_image_file(self, async_client, mock_pytesseract):
         """Test OCR with corrupted image file."""
         corrupted_image = b"not image data"
-        files = {"files": ("corrupted.png", io.BytesIO(corrupted_image), "image/png")}
+        files = {"files": ("corrupted.png", corrupted_image, "image/png")}
         
-        response = client.post("/ocr", files=files)
+        response = await async_client.post("/ocr", files=files)
         assert response.status_code == 500
+        # Decoding fails before any Tesseract run
+        mock_pytesseract.image_to_data.assert_not_called()
 
-    def test_ocr_unsupported_image_format(self, client):
+    @pytest.mark.asyncio
+    async def test_ocr_unsupported_image_format(self, async_client, mock_pytesseract):
         """Test OCR with unsupported image format."""
         unsupported_image = b"fake image data"
-        files = {"files": ("test.bmp", io.BytesIO(unsupported_image), "image/bmp")}
+        files = {"files": ("test.bmp", unsupported_image, "image/bmp")}
+        
+        mock_pytesseract.image_to_data.side_effect = Exception("Unsupported format")
         
-        with patch('main.pytesseract') as mock_tesseract:
-            mock_tesseract.image_to_string.side_effect = Exception("Unsupported format")
-            
-            response = client.post("/ocr", files=files)
-            assert response.status_code == 500
+        response = await async_client.post("/ocr", files=files)
+        assert response.status_code == 500
 
-    def test_ocr_empty_image(self, client):
+    @pytest.mark.asyncio
+    async def test_ocr_empty_image(self, async_client, mock_pytesseract):
         """Test OCR with empty image file."""
-        empty_image = io.BytesIO(b"")
-        files = {"files": ("empty.png", empty_image, "image/png")}
+        files = {"files": ("empty.png", b"", "image/png")}
         
-        response = client.post("/ocr", files=files)
+        response = await async_client.post("/ocr", files=files)
         assert response.status_code == 500
+        # Decoding fails before any Tesseract run
+        mock_pytesseract.image_to_data.assert_not_called()
 
-    def test_ocr_very_large_image(self, client):
+    @pytest.mark.asyncio
+    async def test_ocr_very_large_image(self, async_client, mock_pytesseract):
         """Test OCR with very large image file."""
         # Simulate very large image
         large_image = b"fake image data" * 100000
-        files = {"files": ("large.png", io.BytesIO(large_image), "image/png")}
+        files = {"files": ("large.png", large_image, "image/png")}
+        
+        mock_pytesseract.image_to_data.side_effect = Exception("Image too large")
         
-        with patch('main.pytesseract') as mock_tesseract:
-            mock_tesseract.image_to_string.side_effect = Exception("Image too large")
-            
-            response = client.post("/ocr", files=files)
-            assert response.status_code == 500
+        response = await async_client.post("/ocr", files=files)
+        assert response.status_code == 500
 
-    def test_ocr_tesseract_not_installed(self, client, sample_image_file):
+    @pytest.mark.asyncio
+    async def test_ocr_tesseract_not_installed(self, async_client, sample_image_file, mock_pytesseract):
         """Test OCR when Tesseract is not installed."""
-        files = {"files": ("test.png", io.BytesIO(sample_image_file), "image/png")}
+        files = {"files": ("test.png", sample_image_file, "image/png")}
         
-        with patch('main.pytesseract') as mock_tesseract:
-            mock_tesseract.image_to_string.side_effect = FileNotFoundError("Tesseract not found")
-            
-            response = client.post("/ocr", files=files)
-            assert response.status_code == 500
+        mock_pytesseract.image_to_data.side_effect = FileNotFoundError("Tesseract not found")
+        
+        response = await async_client.post("/ocr", files=files)
+        assert response.status_code == 500
 
-    def test_ocr_tesseract_timeout(self, client, sample_image_file):
+    @pytest.mark.asyncio
+    async def test_ocr_tesseract_timeout(self, async_client, sample_image_file, mock_pytesseract):
         """Test OCR when Tesseract times out."""
-        files = {"files": ("test.png", io.BytesIO(sample_image_file), "image/png")}
+        files = {"files": ("test.png", sample_image_file, "image/png")}
         
-        with patch('main.pytesseract') as mock_tesseract:
-            mock_tesseract.image_to_string.side_effect = TimeoutError("Tesseract timeout")
-            
-            response = client.post("/ocr", files=files)
-            assert response.status_code == 500
+        mock_pytesseract.image_to_data.side_effect = TimeoutError("Tesseract timeout")
+        
+        response = await async_client.post("/ocr", files=files)
+        assert response.status_code == 500
 
-    def test_ocr_memory_error(self, client, sample_image_file):
+    @pytest.mark.asyncio
+    async def test_ocr_memory_error(self, async_client, sample_image_file, mock_pytesseract):
         """Test OCR with memory error."""
-        files = {"files": ("test.png", io.BytesIO(sample_image_file), "image/png")}
+        files = {"files": ("test.png", sample_image_file, "image/png")}
         
-        with patch('main.pytesseract') as mock_tesseract:
-            mock_tesseract.image_to_string.side_effect = MemoryError("Out of memory")
-            
-            response = client.post("/ocr", files=files)
-            assert response.status_code == 500
+        mock_pytesseract.image_to_data.side_effect = MemoryError("Out of memory")
+        
+        response = await async_client.post("/ocr", files=files)
+        assert response.status_code == 500
 
-    def test_ocr_multiple_corrupted_files(self, client):
+    @pytest.mark.asyncio
+    async def test_ocr_multiple_corrupted_files(self, async_client, mock_pytesseract):
         """Test OCR with multiple corrupted files."""
         corrupted_image = b"not image data"
         files = [
-            ("files", ("corrupted1.png", io.BytesIO(corrupted_image), "image/png")),
-            ("files", ("corrupted2.png", io.BytesIO(corrupted_image), "image/png"))
+            ("files", ("corrupted1.png", corrupted_image, "image/png")),
+            ("files", ("corrupted2.png", corrupted_image, "image/png"))
         ]
         
-        response = client.post("/ocr", files=files)
+        response = await async_client.post("/ocr", files=files)
         assert response.status_code == 500
+        # Decoding fails before any Tesseract run
+        mock_pytesseract.image_to_data.assert_not_called()
 
 
 class TestEnvironmentVariableHandling:
     """Test environment variable handling and overrides."""
 
-    def test_asr_environment_variable_override(self, client, sample_audio_file):
+    @pytest.mark.asyncio
+    async def test_asr_environment_variable_override(self, post_asr, mock_whisper_model, monkeypatch):
         """Test ASR with environment variable overrides."""
-        with patch.dict(os.environ, {
-            'ASR_ENABLE_PREPROCESSING': 'true',
-            'ASR_PREPROCESSING_LEVEL': 'aggressive',
-            'ASR_ENABLE_POSTPROCESSING': 'true'
-        }):
-            files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-            
-            with patch('main.get_whisper_model') as mock_model:
-                # Create a proper mock segment object
-                mock_segment = Mock()
-                mock_segment.start = 0.0
-                mock_segment.end = 1.0
-                mock_segment.text = "test transcription"
-                
-                mock_info = Mock()
-                mock_info.language = "en"
-                
-                mock_model.return_value.transcribe.return_value = ([mock_segment], mock_info)
-                
-                response = client.post("/asr", files=files)
-                assert response.status_code == 200
-
-    def test_whisper_model_environment_variables(self):
+        monkeypatch.setenv('ASR_ENABLE_PREPROCESSING', 'true')
+        monkeypatch.setenv('ASR_PREPROCESSING_LEVEL', 'aggressive')
+        monkeypatch.setenv('ASR_ENABLE_POSTPROCESSING', 'true')
+        # Create a proper mock segment object
+        mock_segment = Mock()
+        mock_segment.start = 0.0
+        mock_segment.end = 1.0
+        mock_segment.text = "test transcription"
+        
+        mock_info = Mock()
+        mock_info.language = "en"
+        
+        transcribe = mock_whisper_model.return_value.transcribe
+        transcribe.side_effect = None
+        transcribe.return_value = ([mock_segment], mock_info)
+        
+        response = await post_asr()
+        assert response.status_code == 200
+
+    def test_whisper_model_environment_variables(self, mock_whisper_class, monkeypatch):
         """Test Whisper model with environment variables."""
-        with patch.dict(os.environ, {
-            'WHISPER_MODEL_SIZE': 'small',
-            'WHISPER_COMPUTE_TYPE': 'int8'
-        }):
-            with patch('main.WhisperModel') as mock_whisper:
-                mock_whisper.return_value = Mock()
-                
-                from main import get_whisper_model
-                get_whisper_model()
-                
-                mock_whisper.assert_called_once_with("small", compute_type="int8")
-
-    def test_environment_variable_loading_failure(self):
+        monkeypatch.setenv('WHISPER_MODEL_SIZE', 'small')
+        monkeypatch.setenv('WHISPER_COMPUTE_TYPE', 'int8')
+        from main import get_whisper_model
+        get_whisper_model()
+        
+        mock_whisper_class.assert_called_once_with("small", compute_type="int8")
+
+    def test_environment_variable_loading_failure(self, monkeypatch):
         """Test behavior when environment variable loading fails."""
-        with patch('main.load_dotenv', side_effect=Exception("Failed to load .env")):
-            # Should not raise exception, just log warning
-            import main
-            assert hasattr(main, 'app')
+        monkeypatch.setattr('main.load_dotenv', Mock(side_effect=Exception("Failed to load .env")))
+        # Should not raise exception, just log warning
+        import main
+        assert hasattr(main, 'app')
 
 
 class TestFileHandlingEdgeCases:
     """Test file handling edge cases."""
 
-    def test_asr_file_read_error(self, client):
+    @pytest.mark.asyncio
+    async def test_asr_file_read_error(self, async_client, mock_whisper_model, mock_upload_read_error):
         """Test ASR with file read error."""
-        mock_file = Mock()
-        mock_file.read.side_effect = Exception("File read error")
-        
-        with patch('main.UploadFile', return_value=mock_file):
-            files = {"file": ("test.wav", io.BytesIO(b"fake audio"), "audio/wav")}
-            response = client.post("/asr", files=files)
-            assert response.status_code == 500
+        files = {"file": ("test.wav", b"fake audio", "audio/wav")}
+        response = await async_client.post("/asr", files=files)
+        assert response.status_code == 500
+        mock_whisper_model.assert_not_called()
 
-    def test_asr_file_size_limit(self, client):
+    @pytest.mark.asyncio
+    async def test_asr_file_size_limit(self, async_client, mock_whisper_model):
         """Test ASR with file size limit exceeded."""
         # Simulate very large file
-        large_file = io.BytesIO(b"fake audio data" * 1000000)
-        files = {"file": ("large.wav", large_file, "audio/wav")}
+        files = {"file": ("large.wav", b"fake audio data" * 1000000, "audio/wav")}
+        
+        mock_whisper_model.return_value.transcribe.side_effect = Exception("File too large")
         
-        with patch('main.get_whisper_model') as mock_model:
-            mock_model.return_value.transcribe.side_effect = Exception("File too large")
-            
-            response = client.post("/asr", files=files)
-            assert response.status_code == 500
+        response = await async_client.post("/asr", files=files)
+        assert response.status_code == 500
 
-    def test_ocr_file_permission_error(self, client):
+    @pytest.mark.asyncio
+    async def test_ocr_file_permission_error(self, async_client, mock_pytesseract):
         """Test OCR with file permission error."""
-        with patch('main.pytesseract') as mock_tesseract:
-            mock_tesseract.image_to_string.side_effect = PermissionError("Permission denied")
-            
-            files = {"files": ("test.png", io.BytesIO(b"fake image"), "image/png")}
-            response = client.post("/ocr", files=files)
-            assert response.status_code == 500
+        mock_pytesseract.image_to_data.side_effect = PermissionError("Permission denied")
+        
+        files = {"files": ("test.png", b"fake image", "image/png")}
+        response = await async_client.post("/ocr", files=files)
+        assert response.status_code == 500
 
 
 class TestResponseValidation:
     """Test response validation and edge cases."""
 
-    def test_asr_response_serialization_error(self, client, sample_audio_file, mock_whisper_model):
+    @pytest.mark.asyncio
+    async def test_asr_response_serialization_error(self, post_asr, mock_whisper_model, monkeypatch):
         """Test ASR response serialization error."""
-        files = {"file": ("test.wav", io.BytesIO(sample_audio_file), "audio/wav")}
-        
         # Mock the specific JSON serialization in the response
-        with patch('starlette.responses.JSONResponse.render') as mock_render:
-            mock_render.side_effect = Exception("Serialization error")
-            
-            # The exception should be raised during response rendering
-            with pytest.raises(Exception, match="Serialization error"):
-                client.post("/asr", files=files)
-
-    def test_ocr_response_serialization_error(self, client, sample_image_file, mock_pytesseract):
+        monkeypatch.setattr('starlette.responses.JSONResponse.render', Mock(side_effect=Exception("Serialization error")))
+        
+        # The exception should be raised during response rendering
+        with pytest.raises(Exception, match="Serialization error"):
+            await post_asr()
+
+    @pytest.mark.asyncio
+    async def test_ocr_response_serialization_error(self, async_client, sample_image_file, mock_pytesseract, monkeypatch):
         """Test OCR response serialization error."""
-        files = {"files": ("test.png", io.BytesIO(sample_image_file), "image/png")}
+        files = {"files": ("test.png", sample_image_file, "image/png")}
         
         # Mock the specific JSON serialization in the response
-        with patch('starlette.responses.JSONResponse.render') as mock_render:
-            mock_render.side_effect = Exception("Serialization error")
-            
-            # The exception should be raised during response rendering
-            with pytest.raises(Exception, match="Serialization error"):
-                client.post("/ocr", files=files)
-
-    def test_instagram_response_serialization_error(self, client, sample_instagram_url, mock_instagram_downloader):
+        monkeypatch.setattr('starlette.responses.JSONResponse.render', Mock(side_effect=Exception("Serialization error")))
+        
+        # The exception should be raised during response rendering
+        with pytest.raises(Exception, match="Serialization error"):
+            await async_client.post("/ocr", files=files)
+
+    @pytest.mark.asyncio
+    async def test_instagram_response_serialization_error(self, async_client, sample_instagram_url, mock_instagram_downloader, monkeypatch):
         """Test Instagram response serialization error."""
         request_data = {"url": sample_instagram_url}
         
         # Mock the specific JSON serialization in the response
-        with patch('starlette.responses.JSONResponse.render') as mock_render:
-            mock_render.side_effect = Exception("Serialization error")
-            
-            # The exception should be raised during response rendering
-            with pytest.raises(Exception, match="Serialization error"):
-                client.post("/download-instagram", json=request_data)
+        monkeypatch.setattr('starlette.responses.JSONResponse.render', Mock(side_effect=Exception("Serialization error")))
+        
+        # The exception should be raised during response rendering
+        with pytest.raises(Exception, match="Serialization error"):
+            await async_client.post("/download-instagram", json=request_data)
@@ -2,12 +2,11 @@
 Unit tests for models module - ModelManager and model loading functionality
 """
 import pytest
-import os
 import torch
-from unittest.mock import patch, Mock, MagicMock
+from unittest.mock import ANY, call, patch, Mock, MagicMock
 import numpy as np
 
-from models import ModelManager, model_manager
+from models import ModelManager, model_manager, _cuda_available, _load_spacy_model, _load_sentence_transformer
 
 
 class TestModelManager:
@@ -20,49 +19,59 @@ class TestModelManager:
         assert manager.device in ['cpu', 'cuda']
 
     @patch('torch.cuda.is_available')
-    def test_device_detection_auto_gpu_available(self, mock_cuda_available):
+    def test_device_detection_auto_gpu_available(self, mock_cuda_available, monkeypatch):
         """Test device detection when GPU is available and auto mode."""
         mock_cuda_available.return_value = True
         
-        with patch.dict(os.environ, {'USE_GPU': 'auto'}):
-            manager = ModelManager()
-            assert manager.device == 'cuda'
+        monkeypatch.setenv('USE_GPU', 'auto')
+        manager = ModelManager()
+        assert manager.device == 'cuda'
 
     @patch('torch.cuda.is_available')
-    def test_device_detection_auto_gpu_unavailable(self, mock_cuda_available):
+    def test_device_detection_auto_gpu_unavailable(self, mock_cuda_available, monkeypatch):
         """Test device detection when GPU is unavailable and auto mode."""
         mock_cuda_available.return_value = False
         
-        with patch.dict(os.environ, {'USE_GPU': 'auto'}):
-            manager = ModelManager()
-            assert manager.device == 'cpu'
+        monkeypatch.setenv('USE_GPU', 'auto')
+        manager = ModelManager()
+        assert manager.device == 'cpu'
 
     @patch('torch.cuda.is_available')
-    def test_device_detection_force_gpu_true(self, mock_cuda_available):
+    def test_device_detection_force_gpu_true(self, mock_cuda_available, monkeypatch):
         """Test device detection when GPU is forced to true."""
         mock_cuda_available.return_value = True
         
-        with patch.dict(os.environ, {'USE_GPU': 'true'}):
-            manager = ModelManager()
-            assert manager.device == 'cuda'
+        monkeypatch.setenv('USE_GPU', 'true')
+        manager = ModelManager()
+        assert manager.device == 'cuda'
 
     @patch('torch.cuda.is_available')
-    def test_device_detection_force_gpu_false(self, mock_cuda_available):
+    def test_device_detection_force_gpu_false(self, mock_cuda_available, monkeypatch):
         """Test device detection when GPU is forced to false."""
         mock_cuda_available.return_value = True
         
-        with patch.dict(os.environ, {'USE_GPU': 'false'}):
-            manager = ModelManager()
-            assert manager.device == 'cpu'
+        monkeypatch.setenv('USE_GPU', 'false')
+        manager = ModelManager()
+        assert manager.device == 'cpu'
 
     @patch('torch.cuda.is_available')
-    def test_device_detection_force_gpu_unavailable(self, mock_cuda_available):
+    def test_cuda_probed_once(self, mock_cuda_available, monkeypatch):
+        """Test that CUDA availability is probed once and shared across managers."""
+        mock_cuda_available.return_value = True
+        
+        monkeypatch.setenv('USE_GPU', 'auto')
+        assert ModelManager().device == ModelManager().device == 'cuda'
+        assert _cuda_available()
+        mock_cuda_available.assert_called_once()
+
+    @patch('torch.cuda.is_available')
+    def test_device_detection_force_gpu_unavailable(self, mock_cuda_available, monkeypatch):
         """Test device detection when GPU is forced but unavailable."""
         mock_cuda_available.return_value = False
         
-        with patch.dict(os.environ, {'USE_GPU': 'true'}):
-            manager = ModelManager()
-            assert manager.device == 'cpu'
+        monkeypatch.setenv('USE_GPU', 'true')
+        manager = ModelManager()
+        assert manager.device == 'cpu'
 
 
 class TestNERModelLoading:
@@ -97,23 +106,23 @@ class TestNERModelLoading:
         result = manager.get_ner_model("custom-ner-model")
         
         assert result == mock_pipeline_instance
-        mock_tokenizer.assert_called_once_with("custom-ner-model")
-        mock_model.assert_called_once_with("custom-ner-model")
+        mock_tokenizer.assert_called_once_with("custom-ner-model", local_files_only=True)
+        mock_model.assert_called_once_with("custom-ner-model", local_files_only=True)
 
     @patch('models.AutoTokenizer.from_pretrained')
     @patch('models.AutoModelForTokenClassification.from_pretrained')
     @patch('models.pipeline')
-    def test_get_ner_model_with_env_var(self, mock_pipeline, mock_model, mock_tokenizer):
+    def test_get_ner_model_with_env_var(self, mock_pipeline, mock_model, mock_tokenizer, monkeypatch):
         """Test NER model loading with environment variable."""
         mock_pipeline_instance = Mock()
         mock_pipeline.return_value = mock_pipeline_instance
         
-        with patch.dict(os.environ, {'NER_MODEL': 'env-ner-model'}):
-            manager = ModelManager()
-            result = manager.get_ner_model()
-            
-            mock_tokenizer.assert_called_once_with("env-ner-model")
-            mock_model.assert_called_once_with("env-ner-model")
+        monkeypatch.setenv('NER_MODEL', 'env-ner-model')
+        manager = ModelManager()
+        result = manager.get_ner_model()
+        
+        mock_tokenizer.assert_called_once_with("env-ner-model", local_files_only=True)
+        mock_model.assert_called_once_with("env-ner-model", local_files_only=True)
 
     @patch('models.AutoTokenizer.from_pretrained')
     def test_get_ner_model_loading_failure(self, mock_tokenizer):
@@ -121,8 +130,7 @@ class TestNERModelLoading:
         mock_tokenizer.side_effect = Exception("Model loading failed")
         
         # Clear the cache first
-        from models import _model_cache
-        _model_cache.clear()
+        model_manager.clear_cache()
         
         manager = ModelManager()
         with pytest.raises(Exception, match="Model loading failed"):
@@ -137,8 +145,7 @@ class TestNERModelLoading:
         mock_pipeline.return_value = mock_pipeline_instance
         
         # Clear the cache first
-        from models import _model_cache
-        _model_cache.clear()
+        model_manager.clear_cache()
         
         manager = ModelManager()
         
@@ -176,17 +183,17 @@ class TestMultilingualNERModelLoading:
     @patch('models.AutoTokenizer.from_pretrained')
     @patch('models.AutoModelForTokenClassification.from_pretrained')
     @patch('models.pipeline')
-    def test_get_multilingual_ner_model_with_env_var(self, mock_pipeline, mock_model, mock_tokenizer):
+    def test_get_multilingual_ner_model_with_env_var(self, mock_pipeline, mock_model, mock_tokenizer, monkeypatch):
         """Test multilingual NER model loading with environment variable."""
         mock_pipeline_instance = Mock()
         mock_pipeline.return_value = mock_pipeline_instance
         
-        with patch.dict(os.environ, {'NER_MULTILINGUAL_MODEL': 'env-multilingual-ner'}):
-            manager = ModelManager()
-            result = manager.get_multilingual_ner_model()
-            
-            mock_tokenizer.assert_called_once_with("env-multilingual-ner")
-            mock_model.assert_called_once_with("env-multilingual-ner")
+        monkeypatch.setenv('NER_MULTILINGUAL_MODEL', 'env-multilingual-ner')
+        manager = ModelManager()
+        result = manager.get_multilingual_ner_model()
+        
+        mock_tokenizer.assert_called_once_with("env-multilingual-ner", local_files_only=True)
+        mock_model.assert_called_once_with("env-multilingual-ner", local_files_only=True)
 
 
 class TestSpacyModelLoading:
@@ -215,19 +222,33 @@ class TestSpacyModelLoading:
         result = manager.get_spacy_model("custom-spacy-model")
         
         assert result == mock_nlp
-        mock_spacy_load.assert_called_once_with("custom-spacy-model")
+        mock_spacy_load.assert_called_once_with("custom-spacy-model", disable=['ner', 'lemmatizer'])
 
     @patch('models.spacy.load')
-    def test_get_spacy_model_with_env_var(self, mock_spacy_load):
+    def test_get_spacy_model_with_env_var(self, mock_spacy_load, monkeypatch):
         """Test spaCy model loading with environment variable."""
         mock_nlp = Mock()
         mock_spacy_load.return_value = mock_nlp
         
-        with patch.dict(os.environ, {'SPACY_MODEL': 'env-spacy-model'}):
-            manager = ModelManager()
-            result = manager.get_spacy_model()
-            
-            mock_spacy_load.assert_called_once_with("env-spacy-model")
+        monkeypatch.setenv('SPACY_MODEL', 'env-spacy-model')
+        manager = ModelManager()
+        result = manager.get_spacy_model()
+        
+        mock_spacy_load.assert_called_once_with("env-spacy-model", disable=['ner', 'lemmatizer'])
+
+    @patch('models.spacy.load')
+    def test_get_spacy_model_with_disable(self, mock_spacy_load):
+        """Test that each set of disabled components is loaded and cached separately."""
+        mock_spacy_load.return_value = Mock()
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.get_spacy_model("custom-spacy-model", disable=('ner',))
+        manager.get_spacy_model("custom-spacy-model", disable=('ner',))
+        manager.get_spacy_model("custom-spacy-model")
+        
+        assert mock_spacy_load.call_count == 2
+        mock_spacy_load.assert_any_call("custom-spacy-model", disable=['ner'])
 
     @patch('models.spacy.load')
     def test_get_spacy_model_loading_failure(self, mock_spacy_load):
@@ -235,8 +256,7 @@ class TestSpacyModelLoading:
         mock_spacy_load.side_effect = Exception("spaCy model not found")
         
         # Clear the cache first
-        from models import _model_cache
-        _model_cache.clear()
+        model_manager.clear_cache()
         
         manager = ModelManager()
         with pytest.raises(Exception, match="spaCy model not found"):
@@ -271,16 +291,16 @@ class TestSemanticModelLoading:
         mock_sentence_transformer.assert_called_once_with("custom-semantic-model")
 
     @patch('models.SentenceTransformer')
-    def test_get_semantic_model_with_env_var(self, mock_sentence_transformer):
+    def test_get_semantic_model_with_env_var(self, mock_sentence_transformer, monkeypatch):
         """Test semantic model loading with environment variable."""
         mock_model = Mock()
         mock_sentence_transformer.return_value = mock_model
         
-        with patch.dict(os.environ, {'SEMANTIC_MODEL': 'env-semantic-model'}):
-            manager = ModelManager()
-            result = manager.get_semantic_model()
-            
-            mock_sentence_transformer.assert_called_once_with("env-semantic-model")
+        monkeypatch.setenv('SEMANTIC_MODEL', 'env-semantic-model')
+        manager = ModelManager()
+        result = manager.get_semantic_model()
+        
+        mock_sentence_transformer.assert_called_once_with("env-semantic-model")
 
     @patch('models.SentenceTransformer')
     def test_get_semantic_model_loading_failure(self, mock_sentence_transformer):
@@ -288,8 +308,7 @@ class TestSemanticModelLoading:
         mock_sentence_transformer.side_effect = Exception("Model loading failed")
         
         # Clear the cache first
-        from models import _model_cache
-        _model_cache.clear()
+        model_manager.clear_cache()
         
         manager = ModelManager()
         with pytest.raises(Exception, match="Model loading failed"):
@@ -336,8 +355,7 @@ class TestModelCaching:
         mock_pipeline.return_value = mock_pipeline_instance
         
         # Clear the cache first
-        from models import _model_cache
-        _model_cache.clear()
+        model_manager.clear_cache()
         
         # First manager instance
         manager1 = ModelManager()
@@ -352,17 +370,101 @@ class TestModelCaching:
         # Should only load once
         mock_tokenizer.assert_called_once()
 
-    def test_clear_cache(self):
+    @patch('models.spacy.load')
+    @patch('models.SentenceTransformer')
+    def test_clear_cache(self, mock_sentence_transformer, mock_spacy_load):
         """Test cache clearing functionality."""
-        # Add some mock models to cache
-        from models import _model_cache
-        _model_cache['test_model'] = Mock()
-        _model_cache['another_model'] = Mock()
-        
+        # Load some mock models into the cache
         manager = ModelManager()
+        manager.get_spacy_model("test-spacy-model")
+        manager.get_semantic_model("test-semantic-model")
+        
         manager.clear_cache()
         
-        assert len(_model_cache) == 0
+        assert _load_spacy_model.cache_info().currsize == 0
+        assert _load_sentence_transformer.cache_info().currsize == 0
+        
+        # The next request loads the model again
+        manager.get_spacy_model("test-spacy-model")
+        assert mock_spacy_load.call_count == 2
+
+
+class TestModelWarmup:
+    """Test warmup of freshly loaded models."""
+
+    @patch('models.AutoTokenizer.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_pretrained')
+    @patch('models.pipeline')
+    def test_ner_model_warmup_on_first_load(self, mock_pipeline, mock_model, mock_tokenizer, monkeypatch):
+        """Test that a new NER pipeline is warmed up once, on load."""
+        monkeypatch.setenv('MODEL_WARMUP', 'true')
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cpu'
+        ner_pipeline = manager.get_ner_model("warmup-ner-model")
+        assert ner_pipeline.call_count == 3
+        
+        # A cached model is not warmed up again
+        manager.get_ner_model("warmup-ner-model")
+        assert ner_pipeline.call_count == 3
+
+    @patch('models.SentenceTransformer')
+    def test_semantic_model_warmup_on_first_load(self, mock_sentence_transformer, monkeypatch):
+        """Test that a new semantic model is warmed up by encoding."""
+        monkeypatch.setenv('MODEL_WARMUP', 'true')
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cpu'
+        model = manager.get_semantic_model("warmup-semantic-model")
+        
+        assert model.encode.call_count == 3
+
+    @patch('models.AutoTokenizer.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_pretrained')
+    @patch('models.pipeline')
+    def test_warmup_disabled(self, mock_pipeline, mock_model, mock_tokenizer, monkeypatch):
+        """Test that MODEL_WARMUP=false skips the warmup."""
+        monkeypatch.setenv('MODEL_WARMUP', 'false')
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        ner_pipeline = manager.get_ner_model("warmup-ner-model")
+        
+        ner_pipeline.assert_not_called()
+
+
+class TestModelPreloading:
+    """Test parallel preloading of all models."""
+
+    @patch('models.ModelManager.get_multilingual_semantic_model')
+    @patch('models.ModelManager.get_semantic_model')
+    @patch('models.ModelManager.get_spacy_model')
+    @patch('models.ModelManager.get_multilingual_ner_model')
+    @patch('models.ModelManager.get_ner_model')
+    def test_preload_all_loads_every_model(self, *getters):
+        """Test that preload_all calls each model getter once."""
+        manager = ModelManager()
+        manager.preload_all()
+        
+        for getter in getters:
+            getter.assert_called_once_with()
+
+    @patch('models.ModelManager.get_multilingual_semantic_model')
+    @patch('models.ModelManager.get_semantic_model')
+    @patch('models.ModelManager.get_spacy_model')
+    @patch('models.ModelManager.get_multilingual_ner_model')
+    @patch('models.ModelManager.get_ner_model')
+    def test_preload_all_tolerates_failures(self, mock_get_ner, *other_getters):
+        """Test that one failing model does not stop the others from loading."""
+        mock_get_ner.side_effect = Exception("Model loading failed")
+        
+        manager = ModelManager()
+        manager.preload_all()
+        
+        for getter in other_getters:
+            getter.assert_called_once_with()
 
 
 class TestModelDeviceHandling:
@@ -381,8 +483,159 @@ class TestModelDeviceHandling:
         
         manager.get_ner_model()
         
-        # Model should be moved to GPU
-        mock_model_instance.to.assert_called_once_with('cuda')
+        # Model should be loaded in half precision and moved to GPU
+        mock_model.assert_called_once_with(ANY, torch_dtype=torch.float16, local_files_only=True)
+        mock_model_instance.to.assert_called_once_with('cuda', non_blocking=True)
+
+    @patch.dict('models._ner_weights', clear=True)
+    @patch.object(torch.Tensor, 'pin_memory', lambda tensor: tensor)
+    @patch('models.torch.cuda.is_available', return_value=True)
+    @patch('models.AutoConfig.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_config')
+    @patch('models.AutoTokenizer.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_pretrained')
+    @patch('models.pipeline')
+    def test_ner_model_gpu_reload_uses_pinned_weights(self, mock_pipeline, mock_model, mock_tokenizer,
+                                                      mock_from_config, mock_config, mock_cuda):
+        """Test that reloading a GPU NER model reuses the cached weights instead of the checkpoint."""
+        weights = {'classifier.weight': torch.ones(2, 2)}
+        position_ids = torch.arange(2)
+        mock_model.return_value.state_dict.return_value = weights
+        mock_model.return_value.named_buffers.return_value = [('embeddings.position_ids', position_ids)]
+        # A real module, so the reload's training mode and loaded weights can be checked;
+        # built when from_config is called, so it lands on whatever device the loader set
+        reloaded = torch.nn.Module()
+        
+        def from_config(config):
+            reloaded.classifier = torch.nn.Linear(2, 2, bias=False)
+            reloaded.dropout = torch.nn.Dropout(0.1)
+            reloaded.embeddings = torch.nn.Module()
+            reloaded.embeddings.register_buffer('position_ids', torch.zeros(2, dtype=torch.long), persistent=False)
+            assert reloaded.classifier.weight.is_meta
+            reloaded.to = Mock(return_value=reloaded)
+            return reloaded
+        
+        mock_from_config.side_effect = from_config
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cuda'
+        manager.get_ner_model("pinned-ner")
+        model_manager.clear_cache()
+        manager.get_ner_model("pinned-ner")
+        
+        mock_model.assert_called_once_with("pinned-ner", torch_dtype=torch.float16, local_files_only=True)
+        mock_config.assert_called_once_with("pinned-ner", local_files_only=True)
+        assert torch.equal(reloaded.classifier.weight, weights['classifier.weight'])
+        assert torch.equal(reloaded.embeddings.position_ids, position_ids)
+        # Dropout must be off, or the same text scores differently on every call
+        assert not reloaded.training
+        assert not reloaded.dropout.training
+        assert not reloaded.classifier.weight.requires_grad
+        reloaded.to.assert_called_once_with('cuda', non_blocking=True)
+        assert mock_pipeline.call_args.kwargs['model'] is reloaded
+
+    @patch('models.AutoTokenizer.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_pretrained')
+    @patch('models.pipeline')
+    def test_ner_model_compiled_on_gpu(self, mock_pipeline, mock_model, mock_tokenizer, monkeypatch):
+        """Test that TORCH_COMPILE compiles the GPU NER model before building the pipeline."""
+        monkeypatch.setenv('TORCH_COMPILE', 'true')
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cuda'
+        manager.get_ner_model("compiled-ner")
+        
+        gpu_model = mock_model.return_value.to.return_value
+        gpu_model.compile.assert_called_once_with(mode='default')
+        assert mock_pipeline.call_args.kwargs['model'] is gpu_model
+
+    @patch('models.torch.ao.quantization.quantize_dynamic')
+    @patch('models.AutoTokenizer.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_pretrained')
+    @patch('models.pipeline')
+    def test_ner_model_int8_on_cpu(self, mock_pipeline, mock_model, mock_tokenizer, mock_quantize, monkeypatch):
+        """Test that NER_INT8 quantizes the CPU NER model's linear layers."""
+        monkeypatch.setenv('NER_INT8', 'true')
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cpu'
+        manager.get_ner_model("int8-ner")
+        
+        mock_quantize.assert_called_once_with(mock_model.return_value, {torch.nn.Linear}, dtype=torch.qint8)
+        assert mock_pipeline.call_args.kwargs['model'] is mock_quantize.return_value
+
+    @patch('models.torch.ao.quantization.quantize_dynamic')
+    @patch('models.AutoTokenizer.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_pretrained')
+    @patch('models.pipeline')
+    def test_ner_model_int8_skipped_on_gpu(self, mock_pipeline, mock_model, mock_tokenizer, mock_quantize, monkeypatch):
+        """Test that GPU NER models stay in half precision rather than int8."""
+        monkeypatch.setenv('NER_INT8', 'true')
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cuda'
+        manager.get_ner_model("int8-ner")
+        
+        mock_quantize.assert_not_called()
+
+    @patch('models.SentenceTransformer')
+    def test_semantic_model_onnx_backend(self, mock_sentence_transformer, monkeypatch):
+        """Test that SEMANTIC_BACKEND=onnx lets ONNX Runtime place the model."""
+        monkeypatch.setenv('SEMANTIC_BACKEND', 'onnx')
+        monkeypatch.setenv('TORCH_COMPILE', 'true')
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cuda'
+        model = manager.get_semantic_model("onnx-semantic")
+        
+        mock_sentence_transformer.assert_called_once_with("onnx-semantic", device='cuda', backend='onnx')
+        model.to.assert_not_called()
+        model._first_module().auto_model.compile.assert_not_called()
+
+    @patch('models.SentenceTransformer')
+    def test_semantic_model_compiled_on_gpu(self, mock_sentence_transformer, monkeypatch):
+        """Test that TORCH_COMPILE compiles the transformer inside a GPU semantic model."""
+        monkeypatch.setenv('TORCH_COMPILE', 'true')
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cuda'
+        model = manager.get_semantic_model("compiled-semantic")
+        
+        model._first_module().auto_model.compile.assert_called_once_with(mode='default')
+
+    @patch('models.AutoTokenizer.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_pretrained')
+    @patch('models.pipeline')
+    def test_ner_model_not_compiled_by_default(self, mock_pipeline, mock_model, mock_tokenizer, monkeypatch):
+        """Test that compiling is opt-in."""
+        monkeypatch.delenv('TORCH_COMPILE', raising=False)
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cuda'
+        manager.get_ner_model("uncompiled-ner")
+        
+        mock_model.return_value.to.return_value.compile.assert_not_called()
+
+    @patch('models.AutoTokenizer.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_pretrained')
+    @patch('models.pipeline')
+    def test_ner_model_not_compiled_on_cpu(self, mock_pipeline, mock_model, mock_tokenizer, monkeypatch):
+        """Test that CPU models are left uncompiled."""
+        monkeypatch.setenv('TORCH_COMPILE', 'true')
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cpu'
+        manager.get_ner_model("cpu-ner")
+        
+        mock_model.return_value.compile.assert_not_called()
 
     @patch('models.SentenceTransformer')
     def test_semantic_model_gpu_device(self, mock_sentence_transformer):
@@ -396,7 +649,7 @@ class TestModelDeviceHandling:
         manager.get_semantic_model()
         
         # Model should be moved to GPU
-        mock_model.to.assert_called_once_with('cuda')
+        mock_model.to.assert_called_once_with('cuda', non_blocking=True)
 
     @patch('models.AutoTokenizer.from_pretrained')
     @patch('models.AutoModelForTokenClassification.from_pretrained')
@@ -406,12 +659,16 @@ class TestModelDeviceHandling:
         mock_model_instance = Mock()
         mock_model.return_value = mock_model_instance
         
+        # A cached CPU pipeline would skip the load
+        model_manager.clear_cache()
+        
         manager = ModelManager()
         manager.device = 'cpu'
         
         manager.get_ner_model()
         
-        # Model should not be moved to GPU
+        # Model should be loaded with default precision and not moved to GPU
+        mock_model.assert_called_once_with(ANY, local_files_only=True)
         mock_model_instance.to.assert_not_called()
 
 
@@ -423,6 +680,48 @@ class TestGlobalModelManager:
         assert model_manager is not None
         assert isinstance(model_manager, ModelManager)
 
+    def test_global_model_manager_is_singleton(self):
+        """Test that every access returns the same lazily created instance."""
+        import models
+        assert models.model_manager is models.model_manager
+        assert models.model_manager is model_manager
+
+    def test_unknown_module_attribute(self):
+        """Test that other missing attributes still raise AttributeError."""
+        import models
+        with pytest.raises(AttributeError):
+            models.not_a_model_manager
+
+    @patch('models.ModelManager.preload_all')
+    def test_global_model_manager_preloads_when_enabled(self, mock_preload, monkeypatch):
+        """Test that PRELOAD_MODELS=true loads every model when the manager is created."""
+        import models
+        monkeypatch.setattr(models, '_model_manager', None)
+        monkeypatch.setenv('PRELOAD_MODELS', 'true')
+        
+        models.model_manager
+        models.model_manager
+        
+        mock_preload.assert_called_once_with()
+
+    @patch('models.ModelManager.preload_all')
+    def test_global_model_manager_created_once_under_concurrency(self, mock_preload, monkeypatch):
+        """Test that concurrent first accesses build and preload a single manager."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        import models
+        monkeypatch.setattr(models, '_model_manager', None)
+        monkeypatch.setenv('PRELOAD_MODELS', 'true')
+        mock_preload.side_effect = lambda: time.sleep(0.05)
+        # Slow device detection widens the window between the None check and the assignment
+        monkeypatch.setattr(ModelManager, '_detect_device', lambda self: time.sleep(0.05) or 'cpu')
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            managers = list(executor.map(lambda _: models.model_manager, range(8)))
+
+        mock_preload.assert_called_once_with()
+        assert all(manager is managers[0] for manager in managers)
+
     @patch('models.ModelManager.get_ner_model')
     def test_global_model_manager_functionality(self, mock_get_ner):
         """Test global model manager functionality."""
@@ -443,21 +742,35 @@ class TestEdgeCases:
         mock_tokenizer.side_effect = ConnectionError("Network error")
         
         # Clear the cache first
-        from models import _model_cache
-        _model_cache.clear()
+        model_manager.clear_cache()
         
         manager = ModelManager()
         with pytest.raises(ConnectionError, match="Network error"):
             manager.get_ner_model()
 
+    @patch('models.AutoTokenizer.from_pretrained')
+    @patch('models.AutoModelForTokenClassification.from_pretrained')
+    @patch('models.pipeline')
+    def test_model_loading_falls_back_to_download(self, mock_pipeline, mock_model, mock_tokenizer):
+        """Test that a model missing from the local cache is downloaded."""
+        mock_tokenizer.side_effect = [OSError("not in cache"), Mock()]
+        mock_model.side_effect = [OSError("not in cache"), Mock()]
+        model_manager.clear_cache()
+        
+        manager = ModelManager()
+        manager.device = 'cpu'
+        manager.get_ner_model("uncached-ner")
+        
+        assert mock_tokenizer.call_args_list == [call("uncached-ner", local_files_only=True), call("uncached-ner")]
+        assert mock_model.call_args_list == [call("uncached-ner", local_files_only=True), call("uncached-ner")]
+
     @patch('models.AutoTokenizer.from_pretrained')
     def test_model_loading_memory_error(self, mock_tokenizer):
         """Test model loading with memory error."""
         mock_tokenizer.side_effect = RuntimeError("CUDA out of memory")
         
         # Clear the cache first
-        from models import _model_cache
-        _model_cache.clear()
+        model_manager.clear_cache()
         
         manager = ModelManager()
         with pytest.raises(RuntimeError, match="CUDA out of memory"):
@@ -487,4 +800,4 @@ class TestEdgeCases:
         result = manager.get_ner_model("model-with-special_chars")
         
         assert result == mock_pipeline_instance
-        mock_tokenizer.assert_called_once_with("model-with-special_chars")
+        mock_tokenizer.assert_called_once_with("model-with-special_chars", local_files_only=True)
@@ -3,6 +3,7 @@ Unit tests for NER Service
 """
 
 import pytest
+import torch
 from unittest.mock import Mock, patch, MagicMock
 from services.ner_service import ner_service, NERService
 
@@ -14,10 +15,11 @@ class TestNERService:
         """Test that NER service initializes correctly"""
         service = NERService()
         assert service.confidence_threshold == 0.7
-        assert service.entity_cache == {}
+        assert service._extract_cached.cache_info().currsize == 0
+        assert service._extract_cached.cache_info().maxsize == 1000
         assert service.cache_size == 1000
 
-    @patch('services.ner_service.model_manager.get_ner_model')
+    @patch('models.model_manager.get_ner_model')
     def test_extract_entities_basic(self, mock_get_model):
         """Test basic entity extraction"""
         # Mock the NER pipeline
@@ -41,7 +43,145 @@ class TestNERService:
         assert len(result['entities']['organizations']) > 0
         assert result['entities']['organizations'][0]['text'] == 'Apple'
 
-    @patch('services.ner_service.model_manager.get_ner_model')
+    @patch('models.model_manager.get_ner_model')
+    def test_extract_entities_cached(self, mock_get_model):
+        """Test that repeated texts are served from the result cache"""
+        mock_pipeline = Mock(return_value=[{'entity_group': 'ORG', 'word': 'Apple', 'score': 0.95}])
+        mock_get_model.return_value = mock_pipeline
+        
+        service = NERService()
+        first = service.extract_entities("Apple makes phones", include_relationships=False)
+        first['entities']['organizations'].clear()
+        second = service.extract_entities("Apple makes phones", include_relationships=False)
+        
+        mock_pipeline.assert_called_once()
+        # Mutating a returned result must not leak into the cache
+        assert second['entities']['organizations'][0]['text'] == 'Apple'
+        
+        service.clear_cache()
+        service.extract_entities("Apple makes phones", include_relationships=False)
+        assert mock_pipeline.call_count == 2
+
+    @patch('models.model_manager.get_ner_model')
+    def test_extract_entities_errors_not_cached(self, mock_get_model):
+        """Test that a failed extraction is retried on the next call"""
+        mock_get_model.side_effect = [Exception("Model error"), Mock(return_value=[])]
+        
+        service = NERService()
+        failed = service.extract_entities("Apple makes phones")
+        retried = service.extract_entities("Apple makes phones")
+        
+        assert failed['metadata']['error'] == "Model error"
+        assert 'error' not in retried['metadata']
+
+    @patch('models.model_manager.get_ner_model')
+    @patch('models.model_manager.get_spacy_model')
+    def test_relationship_failure_not_cached(self, mock_spacy, mock_ner):
+        """Test that a result missing relationships after a spaCy failure is not cached"""
+        mock_ner.return_value = Mock(return_value=[{'entity_group': 'ORG', 'word': 'Apple', 'score': 0.95}])
+        mock_spacy.side_effect = [Exception("spaCy model not found"), Mock(return_value=[])]
+        
+        service = NERService()
+        degraded = service.extract_entities("Apple makes phones")
+        recovered = service.extract_entities("Apple makes phones")
+        
+        # The entities are still served while relationships are unavailable
+        assert degraded['entities']['organizations'][0]['text'] == 'Apple'
+        assert degraded['relationships'] == []
+        assert 'error' not in degraded['metadata']
+        # The second call runs extraction again instead of reusing the degraded result
+        assert mock_ner.return_value.call_count == 2
+        assert mock_spacy.call_count == 2
+        assert recovered['entities'] == degraded['entities']
+        assert service._extract_cached.cache_info().currsize == 1
+
+    @patch('models.model_manager.get_ner_model')
+    def test_extract_entities_batch(self, mock_get_model):
+        """Test that batch extraction runs the pipeline once over all texts"""
+        mock_pipeline = Mock()
+        mock_pipeline.return_value = [
+            [{'entity_group': 'ORG', 'word': 'Apple', 'score': 0.95}],
+            [{'entity_group': 'PERSON', 'word': 'Steve Jobs', 'score': 0.90},
+             {'entity_group': 'LOC', 'word': 'Paris', 'score': 0.30}]
+        ]
+        mock_get_model.return_value = mock_pipeline
+        
+        texts = ["Apple makes phones", "Steve Jobs visited Paris"]
+        service = NERService()
+        results = service.extract_entities_batch(texts, language='en', include_relationships=False)
+        
+        mock_pipeline.assert_called_once_with(texts)
+        assert len(results) == 2
+        assert results[0]['entities']['organizations'][0]['text'] == 'Apple'
+        assert results[1]['entities']['persons'][0]['text'] == 'Steve Jobs'
+        assert results[1]['entities']['locations'] == []
+
+    @patch('models.model_manager.get_ner_model')
+    @patch('models.model_manager.get_spacy_model')
+    def test_extract_entities_batch_parses_with_pipe(self, mock_spacy, mock_ner):
+        """Test that batch relationship extraction parses all texts with one nlp.pipe call"""
+        mock_ner.return_value = Mock(return_value=[[], []])
+        mock_nlp = Mock()
+        mock_nlp.pipe.return_value = iter([[], []])
+        mock_spacy.return_value = mock_nlp
+        
+        texts = ["Nike's shoes", "Adidas's shirts"]
+        service = NERService()
+        results = service.extract_entities_batch(texts)
+        
+        mock_nlp.pipe.assert_called_once_with(texts)
+        mock_nlp.assert_not_called()
+        assert all(r['relationships'] == [] for r in results)
+
+    @patch('models.model_manager.get_ner_model')
+    @patch('models.model_manager.get_spacy_model')
+    def test_extract_entities_batch_skips_blank_texts(self, mock_spacy, mock_ner):
+        """Test that blank texts never reach the pipeline and get empty results in place"""
+        mock_pipeline = Mock(return_value=[[{'entity_group': 'ORG', 'word': 'Apple', 'score': 0.95}]])
+        mock_ner.return_value = mock_pipeline
+        mock_nlp = Mock()
+        mock_nlp.pipe.return_value = iter([[]])
+        mock_spacy.return_value = mock_nlp
+        
+        service = NERService()
+        results = service.extract_entities_batch(["", "Apple makes phones", "  \n"])
+        
+        mock_pipeline.assert_called_once_with(["Apple makes phones"])
+        mock_nlp.pipe.assert_called_once_with(["Apple makes phones"])
+        assert results[0] == results[2] == service._get_empty_result('en')
+        assert results[1]['entities']['organizations'][0]['text'] == 'Apple'
+
+    @patch('models.model_manager.get_ner_model')
+    def test_extract_entities_batch_error(self, mock_get_model):
+        """Test that a failing batch returns an error result per text"""
+        mock_get_model.return_value = Mock(side_effect=Exception("Model error"))
+        
+        service = NERService()
+        results = service.extract_entities_batch(["one", "two"])
+        
+        assert len(results) == 2
+        assert all(r['metadata']['error'] == "Model error" for r in results)
+
+    @patch('models.model_manager.get_multilingual_ner_model')
+    @patch('models.model_manager.get_ner_model')
+    def test_pipeline_runs_in_inference_mode(self, mock_get_model, mock_get_multilingual):
+        """Test that every NER pipeline call runs with autograd bookkeeping off"""
+        modes = []
+        def record_mode(inputs):
+            modes.append(torch.is_inference_mode_enabled())
+            return [[] for _ in inputs] if isinstance(inputs, list) else []
+        mock_get_model.return_value = Mock(side_effect=record_mode)
+        mock_get_multilingual.return_value = Mock(side_effect=record_mode)
+        
+        service = NERService()
+        service.extract_entities("Apple makes phones", language='en', include_relationships=False)
+        service.extract_entities("Apple fabrica teléfonos", language='es', include_relationships=False)
+        service.extract_entities_batch(["Apple makes phones"], include_relationships=False)
+        
+        assert modes == [True, True, True]
+        assert not torch.is_inference_mode_enabled()
+
+    @patch('models.model_manager.get_ner_model')
     def test_extract_entities_with_domain_specific(self, mock_get_model):
         """Test entity extraction with domain-specific entities"""
         mock_pipeline = Mock()
@@ -59,7 +199,7 @@ class TestNERService:
         # Check for regulated terms
         assert len(result['entities']['regulated']) > 0
 
-    @patch('services.ner_service.model_manager.get_multilingual_ner_model')
+    @patch('models.model_manager.get_multilingual_ner_model')
     def test_extract_entities_multilingual(self, mock_get_model):
         """Test multilingual entity extraction"""
         mock_pipeline = Mock()
@@ -77,7 +217,7 @@ class TestNERService:
         assert 'entities' in result
         assert result['metadata']['language'] == 'es'
 
-    @patch('services.ner_service.model_manager.get_ner_model')
+    @patch('models.model_manager.get_ner_model')
     def test_confidence_threshold_filtering(self, mock_get_model):
         """Test that entities below confidence threshold are filtered"""
         mock_pipeline = Mock()
@@ -94,8 +234,19 @@ class TestNERService:
         assert len(result['entities']['organizations']) == 1
         assert result['entities']['organizations'][0]['text'] == 'Apple'
 
-    @patch('services.ner_service.model_manager.get_ner_model')
-    @patch('services.ner_service.model_manager.get_spacy_model')
+    def test_confidence_threshold_inclusive(self):
+        """Test that an entity scored exactly at the threshold is kept"""
+        service = NERService()
+        results = [
+            {'entity_group': 'ORG', 'word': 'Apple', 'score': 0.7},
+            {'entity_group': 'ORG', 'word': 'Pear', 'score': 0.6999},
+            {'entity_group': 'ORG', 'word': 'Plum'}
+        ]
+        
+        assert [r['word'] for r in service._filter_by_confidence(results)] == ['Apple']
+
+    @patch('models.model_manager.get_ner_model')
+    @patch('models.model_manager.get_spacy_model')
     def test_relationship_extraction(self, mock_spacy, mock_ner):
         """Test entity relationship extraction"""
         mock_pipeline = Mock()
@@ -127,8 +278,10 @@ class TestNERService:
         assert 'relationships' in result
         # Relationship extraction should be attempted
         assert isinstance(result['relationships'], list)
+        # Both ends of the dependency are extracted entities
+        assert {'entity1': 'Nike', 'entity2': 'shoe', 'type': 'possession', 'confidence': 0.8} in result['relationships']
 
-    @patch('services.ner_service.model_manager.get_ner_model')
+    @patch('models.model_manager.get_ner_model')
     def test_deduplication(self, mock_get_model):
         """Test that duplicate entities are deduplicated"""
         mock_pipeline = Mock()
@@ -146,15 +299,75 @@ class TestNERService:
         assert len(result['entities']['organizations']) == 1
         assert result['entities']['organizations'][0]['confidence'] == 0.95
 
-    def test_empty_text(self):
+    DOMAIN_TEXT = "Nike beats Adidas vs Tesla vs Gap: guaranteed the best, the only #1 Nike MAC"
+    # Keyword-table order (category, then keyword), then text position
+    DOMAIN_ENTITIES = {
+        'brands': [('Tesla', 0.95, 'tech'), ('Nike', 0.95, 'fashion'), ('Nike', 0.95, 'fashion'),
+                   ('Adidas', 0.95, 'fashion'), ('Gap', 0.95, 'fashion'),
+                   ('Tesla', 0.95, 'automotive'), ('MAC', 0.95, 'beauty')],
+        'competitors': [('vs', 0.85)],
+        'regulated': [('guaranteed', 0.9)],
+        'claims': [('best', 0.85), ('#1', 0.85), ('only', 0.85)]
+    }
+
+    def test_domain_keyword_order(self):
+        """Test that domain entities are reported in keyword-table order"""
+        service = NERService()
+        assert service._extract_domain_specific(self.DOMAIN_TEXT) == self.DOMAIN_ENTITIES
+
+    def test_domain_keyword_order_without_automaton(self, monkeypatch):
+        """Test the per-keyword loops used when pyahocorasick is not installed"""
+        import sys
+        monkeypatch.setattr(sys.modules['services.ner_service'], '_DOMAIN_AUTOMATON', None)
+        
+        service = NERService()
+        assert service._extract_domain_specific(self.DOMAIN_TEXT) == self.DOMAIN_ENTITIES
+
+    def test_domain_keyword_automaton_matches_fallback(self):
+        """Test that Aho-Corasick keyword matching returns exactly what the fallback loops do"""
+        pytest.importorskip('ahocorasick')
+        import sys
+        ner_module = sys.modules['services.ner_service']
+        text = "Nike beats Adidas vs Tesla: versus guaranteed, the best vs the only #1 nike MAC"
+        
+        service = NERService()
+        fast = service._extract_domain_specific(text)
+        with patch.object(ner_module, '_DOMAIN_AUTOMATON', None):
+            slow = service._extract_domain_specific(text)
+        
+        assert fast == slow
+
+    @patch('models.model_manager.get_ner_model')
+    def test_deduplication_caseless(self, mock_get_model):
+        """Test that deduplication matches caseless forms, not just lowercase"""
+        mock_pipeline = Mock()
+        mock_pipeline.return_value = [
+            {'entity_group': 'LOC', 'word': 'Hauptstraße', 'score': 0.88},
+            {'entity_group': 'LOC', 'word': 'HAUPTSTRASSE', 'score': 0.91}
+        ]
+        mock_get_model.return_value = mock_pipeline
+        
+        service = NERService()
+        result = service.extract_entities("Hauptstraße HAUPTSTRASSE", language='en')
+        
+        assert len(result['entities']['locations']) == 1
+        assert result['entities']['locations'][0]['text'] == 'HAUPTSTRASSE'
+
+    @patch('models.model_manager.get_ner_model')
+    def test_empty_text(self, mock_get_model):
         """Test extraction on empty text"""
         service = NERService()
         result = service.extract_entities("", language='en')
         
         assert 'entities' in result
         assert sum(len(v) for v in result['entities'].values()) == 0
+        assert result['metadata']['total_entities'] == 0
+        assert 'error' not in result['metadata']
+        # Blank text never reaches the models
+        assert service.extract_entities("  \n", language='en')['metadata']['total_entities'] == 0
+        mock_get_model.assert_not_called()
 
-    @patch('services.ner_service.model_manager.get_ner_model')
+    @patch('models.model_manager.get_ner_model')
     def test_error_handling(self, mock_get_model):
         """Test error handling when model fails"""
         mock_get_model.side_effect = Exception("Model loading failed")
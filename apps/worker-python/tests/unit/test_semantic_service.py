@@ -19,7 +19,7 @@ class TestSemanticService:
         assert service.embedding_cache == {}
         assert service.cache_size == 1000
 
-    @patch('services.semantic_service.model_manager.get_semantic_model')
+    @patch('models.model_manager.get_semantic_model')
     def test_compute_similarity_basic(self, mock_get_model):
         """Test basic similarity computation"""
         # Mock the sentence transformer model
@@ -45,7 +45,7 @@ class TestSemanticService:
         assert len(result['similarity_matrix']) == 3
         assert len(result['similarity_matrix'][0]) == 3
 
-    @patch('services.semantic_service.model_manager.get_multilingual_semantic_model')
+    @patch('models.model_manager.get_multilingual_semantic_model')
     def test_multilingual_similarity(self, mock_get_model):
         """Test multilingual similarity computation"""
         mock_model = Mock()
@@ -66,7 +66,7 @@ class TestSemanticService:
         assert 'similarity_matrix' in result
         assert result['metadata']['language'] == 'es'
 
-    @patch('services.semantic_service.model_manager.get_semantic_model')
+    @patch('models.model_manager.get_semantic_model')
     def test_keyword_clustering(self, mock_get_model):
         """Test keyword clustering functionality"""
         mock_model = Mock()
@@ -94,7 +94,7 @@ class TestSemanticService:
             assert 'keywords' in result['clusters'][0]
             assert 'centroid_keyword' in result['clusters'][0]
 
-    @patch('services.semantic_service.model_manager.get_semantic_model')
+    @patch('models.model_manager.get_semantic_model')
     def test_embedding_caching(self, mock_get_model):
         """Test that embeddings are cached"""
         mock_model = Mock()
@@ -113,7 +113,7 @@ class TestSemanticService:
         # encode should only be called once (cached)
         assert len(service.embedding_cache) > 0
 
-    @patch('services.semantic_service.model_manager.get_semantic_model')
+    @patch('models.model_manager.get_semantic_model')
     def test_similarity_threshold_filtering(self, mock_get_model):
         """Test that similar keywords are grouped by threshold"""
         mock_model = Mock()
@@ -136,7 +136,7 @@ class TestSemanticService:
         assert 'grouped_keywords' in result
         # Keywords above threshold should be grouped together
 
-    @patch('services.semantic_service.model_manager.get_semantic_model')
+    @patch('models.model_manager.get_semantic_model')
     def test_find_semantic_duplicates(self, mock_get_model):
         """Test duplicate detection"""
         mock_model = Mock()
@@ -162,7 +162,7 @@ class TestSemanticService:
             assert len(duplicates[0]) == 3  # (keyword1, keyword2, score)
             assert duplicates[0][2] >= 0.9  # Score should be above threshold
 
-    @patch('services.semantic_service.model_manager.get_semantic_model')
+    @patch('models.model_manager.get_semantic_model')
     def test_topic_coherence(self, mock_get_model):
         """Test topic coherence calculation"""
         mock_model = Mock()
@@ -198,7 +198,7 @@ class TestSemanticService:
     def test_single_keyword(self):
         """Test handling of single keyword"""
         service = SemanticService()
-        with patch('services.semantic_service.model_manager.get_semantic_model') as mock_get_model:
+        with patch('models.model_manager.get_semantic_model') as mock_get_model:
             mock_model = Mock()
             mock_model.encode.return_value = np.array([[0.1, 0.2]])
             mock_get_model.return_value = mock_model
@@ -208,7 +208,7 @@ class TestSemanticService:
             # Should handle single keyword gracefully
             assert 'similarity_matrix' in result
 
-    @patch('services.semantic_service.model_manager.get_semantic_model')
+    @patch('models.model_manager.get_semantic_model')
     def test_error_handling(self, mock_get_model):
         """Test error handling when model fails"""
         mock_get_model.side_effect = Exception("Model loading failed")
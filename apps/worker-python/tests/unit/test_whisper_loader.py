@@ -0,0 +1,73 @@
+"""
+Unit tests for the Whisper model loader
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import whisper_loader
+
+
+class TestWhisperModelLoading:
+    """Test Whisper model loading functionality."""
+
+    def test_whisper_model_lazy_loading(self, mock_whisper_class):
+        """Test that Whisper model is loaded lazily."""
+        # First call should load the model
+        model1 = whisper_loader.get_whisper_model()
+        assert mock_whisper_class.called
+
+        # Second call should return the same model
+        model2 = whisper_loader.get_whisper_model()
+        assert model1 is model2
+        # Should not call WhisperModel again
+        assert mock_whisper_class.call_count == 1
+
+    def test_whisper_model_with_custom_params(self, mock_whisper_class):
+        """Test Whisper model loading with custom parameters."""
+        whisper_loader.get_whisper_model(model_size="large-v3", compute_type="float32")
+
+        mock_whisper_class.assert_called_once_with("large-v3", compute_type="float32")
+
+    def test_whisper_model_environment_variables(self, mock_whisper_class, monkeypatch):
+        """Test Whisper model loading with environment variables."""
+        monkeypatch.setenv('WHISPER_MODEL_SIZE', 'small')
+        monkeypatch.setenv('WHISPER_COMPUTE_TYPE', 'int8')
+
+        whisper_loader.get_whisper_model()
+        mock_whisper_class.assert_called_once_with("small", compute_type="int8")
+
+    def test_whisper_model_invalid_params(self, mock_whisper_class):
+        """Test Whisper model loading with invalid parameters."""
+        # Test with invalid model size (should fallback to medium)
+        whisper_loader.get_whisper_model(model_size="invalid", compute_type="invalid")
+        mock_whisper_class.assert_called_once_with("medium", compute_type="float16")
+
+    def test_whisper_model_reloads_on_new_config(self, mock_whisper_class):
+        """Test that requesting a different size replaces the cached model."""
+        whisper_loader.get_whisper_model(model_size="base", compute_type="int8")
+        whisper_loader.get_whisper_model(model_size="small", compute_type="int8")
+
+        assert mock_whisper_class.call_count == 2
+        assert whisper_loader.model._model_key == "small_int8"
+
+    def test_whisper_model_concurrent_first_load(self, mock_whisper_class):
+        """Test that concurrent first calls load the model exactly once."""
+        start = threading.Barrier(16)
+
+        def slow_load(*args, **kwargs):
+            time.sleep(0.01)  # Widen the window for racing loaders
+            return Mock()
+
+        mock_whisper_class.side_effect = slow_load
+
+        def load(_):
+            start.wait()
+            return whisper_loader.get_whisper_model(model_size="base", compute_type="int8")
+
+        with ThreadPoolExecutor(16) as executor:
+            models = list(executor.map(load, range(16)))
+
+        assert mock_whisper_class.call_count == 1
+        assert all(model is models[0] for model in models)
@@ -0,0 +1,68 @@
+"""
+Lazy loading of the faster-whisper model used for ASR.
+The model is created on first use and cached until a different size or compute type is requested.
+"""
+
+import os
+import logging
+import threading
+from typing import Optional
+
+from faster_whisper import WhisperModel
+
+logger = logging.getLogger(__name__)
+
+# Initialize Whisper model lazily
+model = None
+
+# Serializes loads so concurrent first requests build the model only once
+_lock = threading.Lock()
+
+
+def _is_loaded(model_key: str) -> bool:
+    return model is not None and getattr(model, '_model_key', None) == model_key
+
+
+def get_whisper_model(model_size: Optional[str] = None, compute_type: Optional[str] = None):
+    """
+    Get Whisper model with configurable size and compute type.
+
+    Args:
+        model_size: Model size (base, small, medium, large-v3). Defaults to env var WHISPER_MODEL_SIZE or "medium"
+        compute_type: Compute type (int8, float16, float32). Defaults to env var WHISPER_COMPUTE_TYPE or "float16"
+
+    Returns:
+        WhisperModel instance
+    """
+    global model
+
+    # Get configuration from environment variables or parameters
+    model_size = model_size or os.getenv("WHISPER_MODEL_SIZE", "medium")
+    compute_type = compute_type or os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+
+    # Validate model size
+    valid_sizes = ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"]
+    if model_size not in valid_sizes:
+        logger.warning(f"Invalid model size: {model_size}, using medium")
+        model_size = "medium"
+
+    # Validate compute type
+    valid_compute_types = ["int8", "int8_float16", "int16", "float16", "float32"]
+    if compute_type not in valid_compute_types:
+        logger.warning(f"Invalid compute type: {compute_type}, using float16")
+        compute_type = "float16"
+
+    # Create model key for caching
+    model_key = f"{model_size}_{compute_type}"
+
+    if not _is_loaded(model_key):
+        with _lock:
+            # Another request may have loaded it while we waited for the lock
+            if not _is_loaded(model_key):
+                print(f"Loading Whisper model: {model_size} with {compute_type}...")
+                loaded = WhisperModel(model_size, compute_type=compute_type)
+                loaded._model_key = model_key  # Store model key for caching
+                model = loaded
+                print(f"Whisper model {model_size} loaded with {compute_type}!")
+
+    return model